@@ -0,0 +1,300 @@
+import argparse
+import glob
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from auction_dates import FAILED_BID_RESULT_CODE, current_date_entry, to_int
+from config import EXPORT_DIR
+from log_setup import setup_logging
+from storage import store
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 분석용 내보내기 단계에서만 필요
+    pa = None
+    pq = None
+
+# 분석용 내보내기 가능 여부 (main.py는 불가능하면 내보내기 단계를 제외)
+EXPORT_AVAILABLE = pa is not None
+
+# 한 번에 조회할 경매 문서 수
+FETCH_CHUNK_SIZE = 500
+# 파티션별로 모아 두었다가 파일 하나로 쓸 행 수
+PARTITION_FLUSH_ROWS = 20000
+# 모든 파티션에 쌓아 둘 수 있는 최대 행 수 (넘으면 전부 파일로 내보내 메모리 사용량 제한)
+MAX_BUFFERED_ROWS = 200000
+# 파티션의 parquet 파일이 이 개수 이상이면 하나로 병합
+COMPACT_MIN_FILES = 8
+
+STATE_FILE = "_export_state.json"
+
+EXPORT_PROJECTION = {
+    "csBaseInfo.csNo": 1,
+    "csBaseInfo.cortOfcCd": 1,
+    "dspslGdsDxdyInfo": 1,
+    "gdsDspslDxdyLst": 1,
+    "gdsDspslObjctLst": {"$slice": 1},
+    "location": 1,
+    "isAuctionCancelled": 1
+}
+
+
+def _schemas():
+    auction_schema = pa.schema([
+        ("auctionId", pa.string()),
+        ("csNo", pa.string()),
+        ("cortOfcCd", pa.string()),
+        ("dspslGdsSeq", pa.int64()),
+        ("dxdyYmd", pa.string()),
+        ("auctnDxdyRsltCd", pa.string()),
+        ("aeeEvlAmt", pa.int64()),
+        ("minPrice", pa.int64()),
+        ("saleAmount", pa.int64()),
+        ("failedBidCount", pa.int32()),
+        ("lclsUtilCd", pa.string()),
+        ("mclsUtilCd", pa.string()),
+        ("sclsUtilCd", pa.string()),
+        ("adongSdNm", pa.string()),
+        ("adongSggNm", pa.string()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+        ("isAuctionCancelled", pa.bool_()),
+        ("exportedAt", pa.timestamp("ms"))
+    ])
+    date_schema = pa.schema([
+        ("auctionId", pa.string()),
+        ("csNo", pa.string()),
+        ("cortOfcCd", pa.string()),
+        ("dspslGdsSeq", pa.int64()),
+        ("dxdyYmd", pa.string()),
+        ("dxdyHm", pa.string()),
+        ("auctnDxdyKndCd", pa.string()),
+        ("auctnDxdyRsltCd", pa.string()),
+        ("tsLwsDspslPrc", pa.int64()),
+        ("dspslAmt", pa.int64()),
+        ("exportedAt", pa.timestamp("ms"))
+    ])
+    return auction_schema, date_schema
+
+
+def _month(ymd):
+    return ymd[:6] if ymd and len(ymd) >= 6 else "unknown"
+
+
+def flatten_auction(auction, exported_at):
+    """경매 문서를 경매 행 1개와 기일 행 리스트로 평탄화"""
+    base = auction.get("csBaseInfo", {})
+    dxdy_info = auction.get("dspslGdsDxdyInfo", {})
+    objects = auction.get("gdsDspslObjctLst") or [{}]
+    dates = auction.get("gdsDspslDxdyLst") or []
+    coordinates = (auction.get("location") or {}).get("coordinates") or [None, None]
+
+    auction_id = str(auction["_id"])
+    cort_ofc_cd = base.get("cortOfcCd")
+    seq = to_int(dxdy_info.get("dspslGdsSeq"))
+
+    current = current_date_entry(auction)
+    sale_amounts = [entry.get("dspslAmt") for entry in dates if entry.get("dspslAmt")]
+
+    auction_row = {
+        "auctionId": auction_id,
+        "csNo": base.get("csNo"),
+        "cortOfcCd": cort_ofc_cd,
+        "dspslGdsSeq": seq,
+        "dxdyYmd": current.get("dxdyYmd") or dxdy_info.get("dspslDxdyYmd"),
+        "auctnDxdyRsltCd": current.get("auctnDxdyRsltCd"),
+        "aeeEvlAmt": to_int(dxdy_info.get("aeeEvlAmt")),
+        "minPrice": to_int(current.get("tsLwsDspslPrc")),
+        "saleAmount": to_int(sale_amounts[-1]) if sale_amounts else None,
+        "failedBidCount": sum(1 for entry in dates if entry.get("auctnDxdyRsltCd") == FAILED_BID_RESULT_CODE),
+        "lclsUtilCd": dxdy_info.get("lclsUtilCd"),
+        "mclsUtilCd": dxdy_info.get("mclsUtilCd"),
+        "sclsUtilCd": dxdy_info.get("sclsUtilCd"),
+        "adongSdNm": objects[0].get("adongSdNm"),
+        "adongSggNm": objects[0].get("adongSggNm"),
+        "lat": coordinates[1],
+        "lon": coordinates[0],
+        "isAuctionCancelled": bool(auction.get("isAuctionCancelled", False)),
+        "exportedAt": exported_at
+    }
+
+    date_rows = [
+        {
+            "auctionId": auction_id,
+            "csNo": base.get("csNo"),
+            "cortOfcCd": cort_ofc_cd,
+            "dspslGdsSeq": seq,
+            "dxdyYmd": entry.get("dxdyYmd"),
+            "dxdyHm": entry.get("dxdyHm"),
+            "auctnDxdyKndCd": entry.get("auctnDxdyKndCd"),
+            "auctnDxdyRsltCd": entry.get("auctnDxdyRsltCd"),
+            "tsLwsDspslPrc": to_int(entry.get("tsLwsDspslPrc")),
+            "dspslAmt": to_int(entry.get("dspslAmt")),
+            "exportedAt": exported_at
+        }
+        for entry in dates
+    ]
+    return auction_row, date_rows
+
+
+def _load_state(export_dir):
+    path = os.path.join(export_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(export_dir, state):
+    path = os.path.join(export_dir, STATE_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _partition_dir(export_dir, dataset, cort_ofc_cd, month):
+    return os.path.join(export_dir, dataset, f"cortOfcCd={cort_ofc_cd}", f"month={month}")
+
+
+class PartitionWriter:
+    """
+    데이터셋 하나의 행을 (법원, 월) 파티션별로 모아 parquet 파일로 기록
+
+    파티션별로 PARTITION_FLUSH_ROWS 행이 모이거나 전체 버퍼가 MAX_BUFFERED_ROWS를 넘으면
+    파일로 내보내므로 전체 내보내기에서도 메모리 사용량이 데이터 크기에 비례하지 않는다.
+    """
+
+    def __init__(self, export_dir, dataset, schema, run_id):
+        self.export_dir = export_dir
+        self.dataset = dataset
+        self.schema = schema
+        self.run_id = run_id
+        self.files = 0
+        self.touched = set()
+        self._buffers = defaultdict(list)
+        self._buffered = 0
+
+    def add(self, row):
+        partition = (row["cortOfcCd"], _month(row["dxdyYmd"]))
+        self._buffers[partition].append(row)
+        self._buffered += 1
+        if len(self._buffers[partition]) >= PARTITION_FLUSH_ROWS:
+            self._flush(partition)
+        elif self._buffered >= MAX_BUFFERED_ROWS:
+            self.close()
+
+    def _flush(self, partition):
+        rows = self._buffers.pop(partition, None)
+        if not rows:
+            return
+        partition_dir = _partition_dir(self.export_dir, self.dataset, *partition)
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, f"part-{self.run_id}-{self.files:05d}.parquet")
+        pq.write_table(pa.Table.from_pylist(rows, schema=self.schema), path, compression="zstd")
+        self._buffered -= len(rows)
+        self.files += 1
+        self.touched.add(partition)
+
+    def close(self):
+        """남은 행을 모두 파일로 기록"""
+        for partition in list(self._buffers):
+            self._flush(partition)
+
+
+def compact_partition(partition_dir, run_id):
+    """
+    파티션의 parquet 파일을 하나로 병합하면서 auctionId별 가장 최근 exportedAt 행만 남김
+
+    기일 데이터셋은 경매 하나에 여러 행이 있으므로 가장 최근 내보내기의 행 전체를 남긴다.
+    새 파일을 먼저 쓰고 기존 파일을 지우므로 중간에 중단되어도 중복 행만 남는다.
+    """
+    files = sorted(glob.glob(os.path.join(partition_dir, "*.parquet")))
+    if len(files) < COMPACT_MIN_FILES:
+        return False
+
+    table = pa.concat_tables([pq.read_table(path) for path in files])
+    latest = table.group_by("auctionId").aggregate([("exportedAt", "max")])
+    table = table.join(latest, keys=["auctionId", "exportedAt"], right_keys=["auctionId", "exportedAt_max"],
+                       join_type="inner").select(table.column_names)
+
+    path = os.path.join(partition_dir, f"compacted-{run_id}.parquet")
+    pq.write_table(table, f"{path}.tmp", compression="zstd")
+    os.replace(f"{path}.tmp", path)
+    for old in files:
+        if old != path:
+            os.remove(old)
+    return True
+
+
+def _iter_export_targets(full, since, exported_at):
+    """내보낼 경매 문서 순회 (전체 내보내기는 요약 유무와 관계없이 모든 경매)"""
+    if full:
+        logging.info("분석용 전체 내보내기 대상: 전체 경매")
+        yield from store.iter_auctions(EXPORT_PROJECTION)
+        return
+
+    changed_ids = store.find_summary_ids_updated(since, exported_at)
+    logging.info("분석용 내보내기 대상: %d건 (기준 시각: %s)", len(changed_ids), since)
+    for i in range(0, len(changed_ids), FETCH_CHUNK_SIZE):
+        yield from store.find_auctions_by_ids(changed_ids[i:i + FETCH_CHUNK_SIZE], EXPORT_PROJECTION)
+
+
+def export_auction_outcomes(export_dir=EXPORT_DIR, full=False):
+    """
+    변경된 경매와 기일 내역을 법원/월 파티션의 parquet 파일로 증분 내보내기
+
+    auction_summary.updatedAt이 지난 실행 이후인 경매만 내보내고, full이면 전체 경매를 내보낸다.
+    파일 구성: <export_dir>/<auctions|auction_dates>/cortOfcCd=<법원>/month=<YYYYMM>/
+    part-<실행 ID>-<번호>.parquet (실행마다 추가)과 compacted-<실행 ID>.parquet (병합 결과).
+    파일이 COMPACT_MIN_FILES개 이상 쌓인 파티션은 auctionId별 최신 행만 남기고 병합하지만,
+    병합 전 파일이나 기일이 다른 달로 바뀐 경매는 중복될 수 있으므로
+    분석 시 auctionId별 exportedAt이 가장 최근인 행을 사용한다.
+    """
+    if pa is None:
+        raise RuntimeError("분석용 내보내기에는 pyarrow 패키지가 필요합니다")
+
+    os.makedirs(export_dir, exist_ok=True)
+    state = {} if full else _load_state(export_dir)
+    since = datetime.fromisoformat(state["watermark"]) if state.get("watermark") else None
+
+    exported_at = datetime.now()
+    run_id = exported_at.strftime("%Y%m%d%H%M%S")
+
+    auction_schema, date_schema = _schemas()
+    writers = [
+        PartitionWriter(export_dir, "auctions", auction_schema, run_id),
+        PartitionWriter(export_dir, "auction_dates", date_schema, run_id)
+    ]
+    auction_writer, date_writer = writers
+    exported = 0
+    for auction in _iter_export_targets(full, since, exported_at):
+        auction_row, date_rows = flatten_auction(auction, exported_at)
+        auction_writer.add(auction_row)
+        for row in date_rows:
+            date_writer.add(row)
+        exported += 1
+
+    compacted = 0
+    for writer in writers:
+        writer.close()
+        for partition in writer.touched:
+            if compact_partition(_partition_dir(export_dir, writer.dataset, *partition), run_id):
+                compacted += 1
+
+    _save_state(export_dir, {"watermark": exported_at.isoformat()})
+    logging.info("분석용 내보내기 완료: 경매 %d건, 파일 %d개, 병합한 파티션 %d개, 경로 %s",
+                 exported, sum(writer.files for writer in writers), compacted, export_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="경매 결과를 분석용 parquet 파일로 내보내기")
+    parser.add_argument("--export-dir", default=EXPORT_DIR, help="내보내기 경로")
+    parser.add_argument("--full", action="store_true", help="이전 기록을 무시하고 전체 내보내기")
+    args = parser.parse_args()
+
+    setup_logging()
+    export_auction_outcomes(args.export_dir, full=args.full)
@@ -0,0 +1,43 @@
+# 기일 내역(gdsDspslDxdyLst) 코드 및 공통 함수
+
+# 기일 종류 코드
+AUCTION_KIND_MAPPING = {
+    "매각기일": "01", "매각결정기일": "02", "대금지급기한": "03", "대금지급및 배당기일": "04",
+    "배당기일": "05", "일부배당": "06", "일부배당 및 상계": "07", "심문기일": "08",
+    "추가배당기일": "09", "개찰기일": "11"
+}
+
+# 기일 결과 코드
+AUCTION_RESULT_MAPPING = {
+    "매각준비": "000", "매각": "001", "유찰": "002", "최고가매각허가결정": "003",
+    "차순위매각허가결정": "004", "최고가매각불허가결정": "005", "차순위매각불허가결정": "006",
+    "기한변경": "007", "추후지정": "008", "납부": "009", "미납": "010",
+    "기한후납부": "011", "상계허가": "012", "진행": "013", "변경": "014",
+    "배당종결": "015", "배당불가": "016", "최고가매각허가취소결정": "017", "차순위매각허가취소결정": "018"
+}
+
+SALE_RESULT_CODE = AUCTION_RESULT_MAPPING["매각"]
+FAILED_BID_RESULT_CODE = AUCTION_RESULT_MAPPING["유찰"]
+
+
+def to_int(value):
+    """금액/번호 필드를 정수로 변환 (문자열 금액 포함, 실패 시 None)"""
+    if value is None or value == "":
+        return None
+    try:
+        return int(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def current_date_entry(auction):
+    """
+    현재 기일 내역 항목 (결과가 없는 가장 이른 기일, 모두 결과가 있으면 가장 최근 기일)
+
+    dspslGdsDxdyInfo.dspslDxdyYmd는 기일 내역 갱신 시 바뀌지 않으므로 기일 내역에서 직접 구한다.
+    """
+    dates = [entry for entry in auction.get("gdsDspslDxdyLst") or [] if entry.get("dxdyYmd")]
+    pending = [entry for entry in dates if entry.get("auctnDxdyRsltCd") is None]
+    if pending:
+        return min(pending, key=lambda entry: entry["dxdyYmd"])
+    return max(dates, key=lambda entry: entry["dxdyYmd"]) if dates else {}
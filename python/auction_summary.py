@@ -0,0 +1,106 @@
+import logging
+from datetime import datetime
+
+from pymongo import ASCENDING, GEOSPHERE
+
+from auction_dates import SALE_RESULT_CODE, current_date_entry
+from log_setup import count_event, setup_logging
+from storage import store
+
+# 재생성 시 한 번에 저장할 요약 문서 수
+REBUILD_BATCH_SIZE = 1000
+
+# 요약 문서 생성에 필요한 필드
+SUMMARY_SOURCE_PROJECTION = {
+    "csBaseInfo.csNo": 1,
+    "csBaseInfo.userCsNo": 1,
+    "csBaseInfo.cortOfcCd": 1,
+    "csBaseInfo.cortOfcNm": 1,
+    "dspslGdsDxdyInfo": 1,
+    "gdsDspslDxdyLst": 1,
+    "gdsDspslObjctLst": {"$slice": 1},
+    "location": 1,
+    "isAuctionCancelled": 1
+}
+
+
+def ensure_summary_indexes(collection):
+    """서버 요약 컬렉션에 지도/목록 조회용 인덱스 생성"""
+    collection.create_index([("location", GEOSPHERE)])
+    collection.create_index([("dxdyYmd", ASCENDING)])
+    collection.create_index([("cortOfcCd", ASCENDING), ("dxdyYmd", ASCENDING)])
+    collection.create_index([("adongSdNm", ASCENDING), ("adongSggNm", ASCENDING), ("dxdyYmd", ASCENDING)])
+    collection.create_index([("updatedAt", ASCENDING)])
+
+
+def build_auction_summary(auction):
+    """경매 문서에서 지도/목록 조회에 필요한 필드만 추린 요약 문서 생성"""
+    base = auction.get("csBaseInfo", {})
+    dxdy_info = auction.get("dspslGdsDxdyInfo", {})
+    objects = auction.get("gdsDspslObjctLst") or [{}]
+    current = current_date_entry(auction)
+
+    # 매각된 기일이 있으면 매각 금액 기록
+    sale_amount = None
+    for entry in auction.get("gdsDspslDxdyLst") or []:
+        if entry.get("auctnDxdyRsltCd") == SALE_RESULT_CODE and entry.get("dspslAmt"):
+            sale_amount = entry["dspslAmt"]
+
+    summary = {
+        "_id": auction["_id"],
+        "csNo": base.get("csNo"),
+        "userCsNo": base.get("userCsNo"),
+        "dspslGdsSeq": dxdy_info.get("dspslGdsSeq"),
+        "cortOfcCd": base.get("cortOfcCd"),
+        "cortOfcNm": base.get("cortOfcNm"),
+        "dxdyYmd": current.get("dxdyYmd") or dxdy_info.get("dspslDxdyYmd"),
+        "auctnDxdyRsltCd": current.get("auctnDxdyRsltCd"),
+        "minPrice": current.get("tsLwsDspslPrc"),
+        "saleAmount": sale_amount,
+        "lclsUtilCd": dxdy_info.get("lclsUtilCd"),
+        "mclsUtilCd": dxdy_info.get("mclsUtilCd"),
+        "sclsUtilCd": dxdy_info.get("sclsUtilCd"),
+        "adongSdNm": objects[0].get("adongSdNm"),
+        "adongSggNm": objects[0].get("adongSggNm"),
+        "isAuctionCancelled": auction.get("isAuctionCancelled", False),
+        "updatedAt": datetime.now()  # 분석용 증분 내보내기 기준
+    }
+    # 2dsphere 인덱스는 null 좌표를 허용하지 않으므로 좌표가 있을 때만 포함
+    if auction.get("location"):
+        summary["location"] = auction["location"]
+    return summary
+
+
+def refresh_auction_summary(auction_id):
+    """경매 문서 변경 후 요약 문서 갱신 (원본이 없으면 요약도 삭제)"""
+    auction = store.get_auction(auction_id, SUMMARY_SOURCE_PROJECTION)
+    if not auction:
+        store.delete_summary(auction_id)
+        return
+
+    store.upsert_summary(build_auction_summary(auction))
+    count_event("summary_refreshed")
+
+
+def rebuild_auction_summaries(log_every=1000):
+    """전체 경매 문서로부터 요약 컬렉션을 다시 생성 (최초 적재 및 복구용)"""
+    store.clear_summaries()
+
+    total = 0
+    batch = []
+    for auction in store.iter_auctions(SUMMARY_SOURCE_PROJECTION):
+        batch.append(build_auction_summary(auction))
+        total += 1
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            store.upsert_summaries(batch)
+            batch = []
+        if total % log_every == 0:
+            logging.info("요약 컬렉션 재생성 진행 상황: %d건", total)
+    store.upsert_summaries(batch)
+
+    logging.info("요약 컬렉션 재생성 완료: 총 %d건", total)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    rebuild_auction_summaries()
@@ -7,8 +7,7 @@ from botocore.exceptions import ClientError
 # .env 파일 로드
 load_dotenv()
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+# 로깅 설정은 실행 진입점에서 log_setup.setup_logging()으로 적용
 logger = logging.getLogger(__name__)
 
 
@@ -50,7 +49,8 @@ def get_parameter(param_name, with_decryption=True):
 
 
 # 파라미터 스토어에서 민감한 정보 가져오기
-MONGO_URI = "mongodb://localhost:27017/"
+# 여러 배치 노드가 작업 큐를 공유할 경우 MONGO_URI 환경 변수로 공용 스테이징 DB 지정
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
 SERVER_MONGO_URI = get_parameter("/MONGO_URL") or MONGO_URI
 KAKAO_REST_API_KEY = get_parameter("/KAKAO_REST_API_KEY")
 
@@ -58,6 +58,13 @@ KAKAO_REST_API_KEY = get_parameter("/KAKAO_REST_API_KEY")
 DB_NAME = "apt"
 COLLECTION_NAME = "auctions"
 AUCTION_IMAGES_COLLECTION = "auction_images"
+AUCTION_SUMMARY_COLLECTION = "auction_summary"
+AUCTION_STUDIES_COLLECTION = "auction_studies"
+MARKET_STATS_COLLECTION = "market_stats"
+
+# 스테이징 저장소 설정 (mongo: 로컬 MongoDB, sqlite: mongod 없이 단일 파일 사용)
+STAGING_BACKEND = os.environ.get("STAGING_BACKEND", "mongo")
+STAGING_SQLITE_PATH = os.environ.get("STAGING_SQLITE_PATH", "staging.sqlite3")
 
 # API URL 설정
 LIST_URL = "https://www.courtauction.go.kr/pgj/pgjsearch/searchControllerMain.on"
@@ -78,6 +85,38 @@ HEADERS = {
 # 페이지 크기 설정
 PAGE_SIZE = 40
 
+# 법원 API 요청 속도 제어 설정 (AIMD, 단위: 초당 요청 수)
+THROTTLE_INITIAL_RATE = 1.0  # 시작 요청 속도
+THROTTLE_MIN_RATE = 0.2  # 하한 (최대 5초 간격)
+THROTTLE_MAX_RATE = 5.0  # 상한
+THROTTLE_INCREASE_STEP = 0.1  # 정상 응답 시 가산 증가량
+THROTTLE_DECREASE_FACTOR = 0.5  # 오류/지연 시 곱셈 감소 비율
+THROTTLE_LATENCY_THRESHOLD = 5.0  # 이 시간(초)을 넘는 응답은 지연 급증으로 간주
+THROTTLE_LATENCY_SPIKE_FLOOR = 1.0  # 평균 대비 급증이라도 이 시간(초) 이하면 무시
+REQUEST_TIMEOUT = 30  # 요청 타임아웃 (초)
+
+# 배치 실행 시간 예산 (초) - 초과 시 남은 작업은 다음 실행으로 이월
+RUN_TIME_BUDGET = 5 * 60 * 60
+DEFERRED_WORK_COLLECTION = "deferred_work"
+STAGE_RUNS_COLLECTION = "stage_runs"  # main.py 단계별 실행 시간/결과 기록
+
+# 작업 큐 설정 (USE_JOB_QUEUE=1 이면 상세/현황조사서/기일내역 조회를 큐로 분산 처리)
+USE_JOB_QUEUE = os.environ.get("USE_JOB_QUEUE") == "1"
+JOB_QUEUE_COLLECTION = "batch_jobs"
+JOB_LEASE_SECONDS = 300  # 작업 임대 만료 시간 (초)
+JOB_MAX_ATTEMPTS = 3  # 최대 시도 횟수 (초과 시 failed 처리)
+
+# 프로파일링 설정 (--profile 옵션 사용 시)
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = 0.01  # 스택 샘플링 간격 (초)
+
+# 분석용 컬럼 파일 내보내기 경로
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "exports")
+
+# 로깅 설정
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_COUNTER_FLUSH_INTERVAL = 60  # 반복 이벤트 카운터 요약 출력 주기 (초)
+
 if __name__ == "__main__":
     api_key = get_parameter("/KAKAO_REST_API_KEY") or os.environ.get("KAKAO_REST_API_KEY", "")
     if api_key:
@@ -1,13 +1,16 @@
 import logging
-from pymongo import MongoClient
 
-from config import MONGO_URI, DB_NAME, COLLECTION_NAME, AUCTION_IMAGES_COLLECTION
+from datetime import datetime
 
-# MongoDB 연결 설정
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
-auctions_collection = db[COLLECTION_NAME]
-images_collection = db[AUCTION_IMAGES_COLLECTION]
+from bson import ObjectId
+
+from auction_summary import refresh_auction_summary
+from config import DEFERRED_WORK_COLLECTION
+from market_stats import record_auction_replaced, record_date_changes
+from storage import store
+
+# 상세 응답의 이미지를 모아서 저장할 개수 (이미지 원소가 커서 응답 전체를 모아 두지 않음)
+IMAGE_BATCH_SIZE = 10
 
 # def is_duplicate(srn_sa_no, maemul_ser, bo_cd):
 #     """중복 검사: userCsNo, dspslGdsSeq(숫자 변환), bo_cd 기반"""
@@ -37,37 +40,94 @@ def save_images(csPicLst, auction_id):
         })
 
     # 여러 개의 문서를 한 번에 삽입하고 `_id` 리스트 반환
-    inserted_result = images_collection.insert_many(image_docs)
-    return inserted_result.inserted_ids
+    return store.insert_images(image_docs)
+
+
+class ImageStreamWriter:
+    """스트리밍으로 받은 csPicLst 원소를 IMAGE_BATCH_SIZE개씩 `auction_images` 컬렉션에 저장"""
 
+    def __init__(self, auction_id):
+        self.auction_id = auction_id
+        self.image_ids = []
+        self._buffer = []
 
-def save_auction_detail(data, csPicLst):
-    """경매 상세 정보를 `auctions` 컬렉션에 저장하고, `auction_images` 컬렉션에 이미지 저장"""
-    auction_result = auctions_collection.insert_one(data)
-    auction_id = auction_result.inserted_id  # 경매 데이터의 `_id`
+    def add(self, pic):
+        self._buffer.append(pic)
+        if len(self._buffer) >= IMAGE_BATCH_SIZE:
+            self.flush()
 
-    # 이미지 데이터가 있다면 별도 컬렉션에 저장하고, 참조 ID만 auctions에 저장
-    if csPicLst:
-        image_ids = save_images(csPicLst, auction_id)
-        auctions_collection.update_one({"_id": auction_id}, {"$set": {"csPicLst": image_ids}})
+    def flush(self):
+        if self._buffer:
+            self.image_ids.extend(save_images(self._buffer, self.auction_id))
+            self._buffer = []
 
+    def discard(self):
+        """응답을 끝까지 받지 못했을 때 지금까지 저장한 이미지 삭제"""
+        self._buffer = []
+        store.delete_images(self.image_ids)
+        self.image_ids = []
 
-# 새로운 컬렉션 설정
-auction_studies_collection = db["auction_studies"]
+
+def start_image_stream(existing_doc=None):
+    """
+    상세 응답의 이미지를 저장할 ImageStreamWriter 생성
+
+    새 경매는 이미지가 참조할 문서 ID를 미리 정하고,
+    기존 경매는 이전 이미지를 먼저 삭제한 뒤 같은 문서 ID로 새 이미지를 저장한다.
+    """
+    if existing_doc is None:
+        return ImageStreamWriter(ObjectId())
+
+    old_image_ids = existing_doc.get("csPicLst", [])
+    if old_image_ids:
+        store.delete_images(old_image_ids)
+        # 새 상세 정보 저장 전에 중단되어도 삭제된 이미지를 참조하지 않도록
+        store.update_auction(existing_doc["_id"], {"csPicLst": []})
+        logging.debug("기존 이미지 %d개 삭제 완료", len(old_image_ids))
+    return ImageStreamWriter(existing_doc["_id"])
+
+
+def save_auction_detail(data, images):
+    """경매 상세 정보를 `auctions` 컬렉션에 저장 (이미지는 images로 미리 저장하고 참조 ID만 저장)"""
+    images.flush()
+    data["_id"] = images.auction_id
+    if images.image_ids:
+        data["csPicLst"] = images.image_ids
+    auction_id = store.insert_auction(data)
+
+    # 처음 저장할 때 이미 결과가 있는 기일도 시장 통계에 반영
+    record_date_changes(data, None, data.get("gdsDspslDxdyLst"))
+    refresh_auction_summary(auction_id)
+
+
+def find_auction(srn_sa_no, maemul_ser, bo_cd):
+    """사건번호, 매물번호, 법원코드로 기존 경매 문서 조회"""
+    return store.find_auction(bo_cd, srn_sa_no, int(maemul_ser))
+
+
+def replace_auction_detail(existing_doc, data, images):
+    """
+    기일 변경 시 기존 경매 문서를 새 상세 정보로 갱신
+
+    이전 이미지는 start_image_stream(existing_doc)에서 삭제되었고 새 이미지는 images에 저장되어 있다.
+    """
+    images.flush()
+    data["csPicLst"] = images.image_ids
+
+    # 문서 업데이트
+    store.update_auction(existing_doc["_id"], data)
+    record_auction_replaced(existing_doc, data)
+    refresh_auction_summary(existing_doc["_id"])
 
 
 def is_auction_study_duplicate(srn_sa_no, bo_cd):
     """중복 검사: 사건번호(csNo), 법원 코드(cortOfcCd) 기반"""
-    existing_doc = auction_studies_collection.find_one({
-        "reference.cortOfcCd": bo_cd,
-        "reference.csNo": srn_sa_no
-    })
-    return existing_doc is not None
+    return store.study_exists(bo_cd, srn_sa_no)
 
 
 def save_auction_study(data):
     """물건 상세 정보를 auction_studies 컬렉션에 저장"""
-    auction_studies_collection.insert_one(data)
+    store.insert_study(data)
 
 
 def check_and_update_auction(srn_sa_no, maemul_ser, bo_cd, list_auction_date):
@@ -88,11 +148,7 @@ def check_and_update_auction(srn_sa_no, maemul_ser, bo_cd, list_auction_date):
     except ValueError:
         return False, False  # 변환 실패 시 중복 아님
 
-    existing_doc = auctions_collection.find_one({
-        "csBaseInfo.userCsNo": srn_sa_no,
-        "dspslGdsDxdyInfo.dspslGdsSeq": maemul_ser,
-        "csBaseInfo.cortOfcCd": bo_cd
-    })
+    existing_doc = store.find_auction(bo_cd, srn_sa_no, maemul_ser)
 
     if not existing_doc:
         return False, False  # 중복 아님, 업데이트 필요 없음
@@ -111,3 +167,35 @@ def check_and_update_auction(srn_sa_no, maemul_ser, bo_cd, list_auction_date):
                 f"기일 정보 불일치 감지: {srn_sa_no}, {maemul_ser}, {bo_cd}, 기존: {existing_date}, 새로운: {list_auction_date}")
 
     return True, need_update  # (중복임, 업데이트 필요 여부)
+
+
+def clear_deferred_work(stage):
+    """단계 시작 시 지난 실행에서 이월된 기록 삭제 (이번 실행에서 다시 처리하고 남은 작업만 새로 기록)"""
+    store.delete_documents(DEFERRED_WORK_COLLECTION, "stage", stage)
+
+
+def save_deferred_work(stage, items, key_fields=("boCd", "srnSaNo", "maemulSer")):
+    """
+    시간 예산 초과로 처리하지 못한 작업을 `deferred_work` 컬렉션에 기록
+
+    같은 작업은 (단계, key_fields) 기준으로 하나의 문서만 유지하므로 매일 이월되어도 누적되지 않는다.
+
+    Args:
+        stage: 작업 단계 이름 (예: "fetch_list_0004601", "fetch_detail_0004601", "update_expired")
+        items: 작업 키 딕셔너리 리스트 (dueYmd 포함 가능)
+        key_fields: 작업을 구분하는 필드
+    """
+    if not items:
+        return
+
+    deferred_at = datetime.now()
+    store.upsert_documents(DEFERRED_WORK_COLLECTION, [
+        {
+            "_id": "|".join([stage] + [str(item.get(field, "")) for field in key_fields]),
+            "stage": stage,
+            "deferredAt": deferred_at,
+            **item
+        }
+        for item in items
+    ])
+    logging.warning(f"[{stage}] 시간 예산 초과로 {len(items)}건을 다음 실행으로 이월")
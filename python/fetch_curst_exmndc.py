@@ -1,22 +1,27 @@
 import logging
-import time
 
 import requests
 
 from config import DETAIL_CURST_URL, HEADERS
 from db import is_auction_study_duplicate, save_auction_study
+from json_stream import stream_json
+from log_setup import count_event
+from throttle import court_throttle
 
 
 def fetch_curst_exmndc(srn_sa_no, bo_cd):
     """
     물건 상세 조회 후 auction_studies 컬렉션에 저장 (중복 검사 포함)
+
+    Returns:
+        bool: 요청이 실패하여 다시 시도해야 하면 False
     """
     if is_auction_study_duplicate(srn_sa_no, bo_cd):
-        logging.info(f"이미 존재하는 현황조사서 데이터: 사건번호 {srn_sa_no}, 법원 코드 {bo_cd}")
-        return  # 중복 데이터이므로 API 호출하지 않음
+        count_event("study_duplicate_skip")
+        logging.debug("이미 존재하는 현황조사서 데이터: 사건번호 %s, 법원 코드 %s", srn_sa_no, bo_cd)
+        return True  # 중복 데이터이므로 API 호출하지 않음
 
-    time.sleep(0.1)
-    logging.info(f"현황조사서 조회 요청: 사건번호 {srn_sa_no}, 법원 코드 {bo_cd}")
+    logging.debug("현황조사서 조회 요청: 사건번호 %s, 법원 코드 %s", srn_sa_no, bo_cd)
 
     data = {
         "dma_srchCurstExmn": {
@@ -28,11 +33,11 @@ def fetch_curst_exmndc(srn_sa_no, bo_cd):
     }
 
     try:
-        response = requests.post(DETAIL_CURST_URL, headers=HEADERS, json=data)
-        response.raise_for_status()
-        result = response.json()
+        # 저장할 data 필드만 만들고 응답 본문 전체는 메모리에 올리지 않음
+        with court_throttle.stream_post(DETAIL_CURST_URL, headers=HEADERS, json=data) as response:
+            response.raise_for_status()
+            auction_study_data = stream_json(response, subtrees=["data"]).get("data")
 
-        auction_study_data = result.get("data", None)
         if auction_study_data:
             # 참조 정보 추가
             auction_study_data["reference"] = {
@@ -41,9 +46,12 @@ def fetch_curst_exmndc(srn_sa_no, bo_cd):
             }
 
             save_auction_study(auction_study_data)
-            logging.info(f"현황조사서 저장 완료: 사건번호 {srn_sa_no}, 법원 코드 {bo_cd}")
+            count_event("study_saved")
+            logging.debug("현황조사서 저장 완료: 사건번호 %s, 법원 코드 %s", srn_sa_no, bo_cd)
         else:
-            logging.warning(f"현황조사서 데이터 없음: 사건번호 {srn_sa_no}, 법원 코드 {bo_cd}")
+            logging.warning("현황조사서 데이터 없음: 사건번호 %s, 법원 코드 %s", srn_sa_no, bo_cd)
+        return True
 
     except requests.exceptions.RequestException as e:
-        logging.error(f"현황조사서 조회 요청 실패: {e}")
+        logging.error("현황조사서 조회 요청 실패: %s", e)
+        return False
@@ -1,17 +1,76 @@
 import logging
 import math
-import time
 
 import requests
 
-from config import LIST_URL, HEADERS, PAGE_SIZE
+from config import LIST_URL, HEADERS, PAGE_SIZE, USE_JOB_QUEUE
+from db import clear_deferred_work, save_deferred_work
 from fetch_curst_exmndc import fetch_curst_exmndc  # 물건 상세 조회 추가
 from fetch_detail import fetch_auction_detail
+from job_queue import JOB_DETAIL, JOB_STUDY, enqueue_job
+from json_stream import stream_json
+from log_setup import count_event
+from scheduler import run_budget, urgency_key
+from throttle import court_throttle
 from utils import get_date_str
 
 
-def fetch_auction_data(cortAuctnSrchCondCd, bid_start_days, bid_end_days):
-    """법원경매 목록을 조회하고 바로 상세 정보를 검색하여 저장"""
+def fetch_auction_data(cortAuctnSrchCondCd, bid_start_days, bid_end_days, use_queue=USE_JOB_QUEUE):
+    """
+    법원경매 목록을 조회한 뒤 기일이 임박한 순서로 상세 정보를 검색하여 저장
+    use_queue: True이면 상세/현황조사서 조회를 직접 하지 않고 작업 큐에 등록 (worker.py가 처리)
+    """
+    # 지난 실행의 이월 기록은 이번 실행에서 다시 목록을 조회하므로 삭제
+    clear_deferred_work(f"fetch_list_{cortAuctnSrchCondCd}")
+    clear_deferred_work(f"fetch_detail_{cortAuctnSrchCondCd}")
+
+    items = fetch_auction_list(cortAuctnSrchCondCd, bid_start_days, bid_end_days)
+
+    if use_queue:
+        enqueue_auction_jobs(items)
+        return
+
+    items.sort(key=lambda item: urgency_key(item.get("maeGiil")))
+
+    for index, item in enumerate(items):
+        if run_budget.exhausted():
+            save_deferred_work(f"fetch_detail_{cortAuctnSrchCondCd}", [
+                {
+                    "boCd": rest["boCd"],
+                    "srnSaNo": rest["srnSaNo"],
+                    "maemulSer": rest["maemulSer"],
+                    "dueYmd": rest.get("maeGiil", "")
+                }
+                for rest in items[index:]
+            ])
+            break
+
+        # ✅ 물건 상세 정보 추가 요청 및 저장 (기일 정보 전달)
+        fetch_auction_detail(item["srnSaNo"], item["maemulSer"], item["boCd"], item.get("maeGiil", ""))
+        # ✅ 물건 현황조사서 정보 추가 요청 및 저장
+        fetch_curst_exmndc(item["srnSaNo"], item["boCd"])
+
+    court_throttle.log_metrics()
+
+
+def enqueue_auction_jobs(items):
+    """목록 매물별 상세 조회 및 현황조사서 조회 작업을 작업 큐에 등록"""
+    enqueued = 0
+    for item in items:
+        due_ymd = item.get("maeGiil", "")
+        if enqueue_job(JOB_DETAIL, item["boCd"], item["srnSaNo"], item["maemulSer"],
+                       due_ymd=due_ymd, payload={"maeGiil": due_ymd}):
+            enqueued += 1
+        # 현황조사서는 사건 단위이므로 매물번호 없이 등록
+        if enqueue_job(JOB_STUDY, item["boCd"], item["srnSaNo"], due_ymd=due_ymd):
+            enqueued += 1
+
+    logging.info(f"상세/현황조사서 조회 작업 등록 완료: 매물 {len(items)}건, 신규 작업 {enqueued}건")
+
+
+def fetch_auction_list(cortAuctnSrchCondCd, bid_start_days, bid_end_days):
+    """법원경매 목록 전체 페이지를 조회하여 상세 조회 대상 매물 리스트 반환"""
+    targets = []
     page_no = 1
     total_count = None
 
@@ -19,7 +78,16 @@ def fetch_auction_data(cortAuctnSrchCondCd, bid_start_days, bid_end_days):
     bid_end_date = get_date_str(bid_end_days)
 
     while True:
-        time.sleep(0.5)  # 요청 간격 조정
+        if run_budget.exhausted():
+            logging.warning(f"[{cortAuctnSrchCondCd}] 시간 예산 초과로 목록 조회 중단 (페이지 {page_no})")
+            # 기간이 매일 바뀌어 페이지 위치로 이어서 조회할 수 없으므로 중단된 조건과 기간만 기록
+            save_deferred_work(f"fetch_list_{cortAuctnSrchCondCd}", [{
+                "cortAuctnSrchCondCd": cortAuctnSrchCondCd,
+                "bidBgngYmd": bid_start_date,
+                "bidEndYmd": bid_end_date
+            }], key_fields=("cortAuctnSrchCondCd", "bidBgngYmd", "bidEndYmd"))
+            break
+
         logging.info(
             f"[{cortAuctnSrchCondCd}] {bid_start_date} ~ {bid_end_date} (페이지 {page_no}) 요청 중...")
 
@@ -40,27 +108,17 @@ def fetch_auction_data(cortAuctnSrchCondCd, bid_start_days, bid_end_days):
         }
 
         try:
-            response = requests.post(LIST_URL, headers=HEADERS, json=data)
-            response.raise_for_status()
-            result = response.json()
+            # 응답 전체를 만들지 않고 목록 항목을 하나씩 받아 대상만 남김
+            with court_throttle.stream_post(LIST_URL, headers=HEADERS, json=data) as response:
+                response.raise_for_status()
+                result = stream_json(response, subtrees=["data.dma_pageInfo.totalCnt"],
+                                     items={"data.dlt_srchResult.item": lambda item: collect_target(item, targets)})
 
             if total_count is None:
-                total_count = int(result["data"]["dma_pageInfo"].get("totalCnt", 0))
-
-            logging.info(f"현재 페이지: {page_no} / 총 페이지: {math.ceil(total_count / PAGE_SIZE)} , 총 개수: {total_count}")
-
-            items = result["data"].get("dlt_srchResult", [])
-
-            for item in items:
-                # 자동차 및 기타 매물인 경우 조회하지 않기
-                if item["lclsUtilCd"] == "30000" or item["lclsUtilCd"] == "40000":
-                    logging.info("자동차 및 기타 매물: 조회하지 않음")
-                    continue
+                total_count = int(result.get("data.dma_pageInfo.totalCnt") or 0)
 
-                # ✅ 물건 상세 정보 추가 요청 및 저장 (기일 정보 전달)
-                fetch_auction_detail(item["srnSaNo"], item["maemulSer"], item["boCd"], item.get("maeGiil", ""))
-                # ✅ 물건 현황조사서 정보 추가 요청 및 저장
-                fetch_curst_exmndc(item["srnSaNo"], item["boCd"])
+            logging.info(f"현재 페이지: {page_no} / 총 페이지: {math.ceil(total_count / PAGE_SIZE)} , 총 개수: {total_count}, "
+                         f"요청 속도: {court_throttle.rate:.2f} req/s")
 
             if page_no * PAGE_SIZE >= total_count:
                 logging.info("모든 페이지 수집 완료")
@@ -71,3 +129,15 @@ def fetch_auction_data(cortAuctnSrchCondCd, bid_start_days, bid_end_days):
         except requests.exceptions.RequestException as e:
             logging.error(f"목록 조회 요청 실패: {e}")
             break
+
+    return targets
+
+
+def collect_target(item, targets):
+    """목록 항목 중 상세 조회 대상만 추가"""
+    # 자동차 및 기타 매물인 경우 조회하지 않기
+    if item["lclsUtilCd"] == "30000" or item["lclsUtilCd"] == "40000":
+        count_event("list_vehicle_skip")  # 자동차 및 기타 매물: 조회하지 않음
+        return
+
+    targets.append(item)
@@ -0,0 +1,142 @@
+import logging
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient, ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config import MONGO_URI, DB_NAME, JOB_QUEUE_COLLECTION, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+from scheduler import urgency_key
+
+# 작업 종류
+JOB_DETAIL = "detail"  # 경매 상세 조회 (fetch_auction_detail)
+JOB_STUDY = "study"  # 현황조사서 조회 (fetch_curst_exmndc)
+JOB_HISTORY = "history"  # 기일 내역 갱신 (update_expired_auctions)
+
+# 작업 상태
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# 작업 큐는 여러 노드가 공유해야 하므로 스테이징 저장소 종류와 관계없이 MongoDB 사용
+client = MongoClient(MONGO_URI)
+jobs_collection = client[DB_NAME][JOB_QUEUE_COLLECTION]
+_indexes_ready = False
+
+
+def ensure_job_indexes():
+    """작업 키 유일 인덱스 및 임대 조회용 인덱스 생성"""
+    global _indexes_ready
+    jobs_collection.create_index(
+        [("kind", ASCENDING), ("boCd", ASCENDING), ("srnSaNo", ASCENDING), ("maemulSer", ASCENDING)],
+        unique=True
+    )
+    jobs_collection.create_index(
+        [("kind", ASCENDING), ("status", ASCENDING), ("priority", ASCENDING), ("createdAt", ASCENDING)]
+    )
+    jobs_collection.create_index([("status", ASCENDING), ("leaseExpiresAt", ASCENDING)])
+    _indexes_ready = True
+
+
+def enqueue_job(kind, bo_cd, srn_sa_no, maemul_ser=None, due_ymd=None, payload=None):
+    """
+    작업 등록 (boCd, srnSaNo, maemulSer 기준 중복 없음)
+
+    대기/처리 중인 동일 작업이 있으면 무시하고, 완료/실패한 작업은 다시 대기 상태로 되돌린다.
+
+    Returns:
+        bool: 새로 등록(또는 재등록)되었는지 여부
+    """
+    if not _indexes_ready:
+        ensure_job_indexes()  # 유일 인덱스가 있어야 중복 등록이 방지됨
+
+    key = {"kind": kind, "boCd": bo_cd, "srnSaNo": srn_sa_no, "maemulSer": maemul_ser}
+    now = datetime.now()
+
+    try:
+        jobs_collection.update_one(
+            {**key, "status": {"$in": [STATUS_DONE, STATUS_FAILED]}},
+            {
+                "$set": {
+                    "status": STATUS_PENDING,
+                    "priority": urgency_key(due_ymd)[0],
+                    "dueYmd": due_ymd,
+                    "payload": payload or {},
+                    "attempts": 0,
+                    "leasedBy": None,
+                    "leaseExpiresAt": None,
+                    "lastError": None,
+                    "updatedAt": now
+                },
+                "$setOnInsert": {"createdAt": now}
+            },
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False  # 이미 대기 중이거나 처리 중인 작업
+
+
+def claim_job(worker_id, kinds=None, lease_seconds=JOB_LEASE_SECONDS):
+    """
+    대기 중이거나 임대가 만료된 작업 하나를 원자적으로 임대
+
+    Returns:
+        임대한 작업 문서 또는 작업이 없으면 None
+    """
+    now = datetime.now()
+    query = {
+        "$or": [
+            {"status": STATUS_PENDING},
+            {"status": STATUS_LEASED, "leaseExpiresAt": {"$lt": now}}
+        ]
+    }
+    if kinds:
+        query["kind"] = {"$in": list(kinds)}
+
+    return jobs_collection.find_one_and_update(
+        query,
+        {
+            "$set": {
+                "status": STATUS_LEASED,
+                "leasedBy": worker_id,
+                "leaseExpiresAt": now + timedelta(seconds=lease_seconds),
+                "updatedAt": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("priority", ASCENDING), ("createdAt", ASCENDING)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def ack_job(job_id):
+    """
+    작업 완료 처리 (멱등: 이미 완료된 작업이면 아무것도 하지 않음)
+
+    Returns:
+        bool: 이번 호출로 완료 상태가 되었는지 여부
+    """
+    result = jobs_collection.update_one(
+        {"_id": job_id, "status": {"$ne": STATUS_DONE}},
+        {"$set": {"status": STATUS_DONE, "leaseExpiresAt": None, "completedAt": datetime.now()}}
+    )
+    return result.modified_count > 0
+
+
+def fail_job(job, error):
+    """작업 실패 처리 (최대 시도 횟수 전까지는 다시 대기 상태로 반환)"""
+    status = STATUS_FAILED if job.get("attempts", 0) >= JOB_MAX_ATTEMPTS else STATUS_PENDING
+    jobs_collection.update_one(
+        {"_id": job["_id"], "status": STATUS_LEASED, "leasedBy": job.get("leasedBy")},
+        {"$set": {"status": status, "leaseExpiresAt": None, "lastError": str(error), "updatedAt": datetime.now()}}
+    )
+    logging.warning(f"작업 실패 ({status}): {job['kind']} {job['srnSaNo']} {job.get('maemulSer')}, 오류: {error}")
+
+
+def count_open_jobs(kinds=None):
+    """대기 중이거나 처리 중인 작업 수"""
+    query = {"status": {"$in": [STATUS_PENDING, STATUS_LEASED]}}
+    if kinds:
+        query["kind"] = {"$in": list(kinds)}
+    return jobs_collection.count_documents(query)
@@ -0,0 +1,130 @@
+import requests
+
+try:
+    import ijson
+except ImportError:  # 없으면 response.json()으로 전체를 읽은 뒤 필요한 부분만 추출
+    ijson = None
+
+# 스트리밍 파싱 시 한 번에 읽을 바이트 수
+READ_CHUNK_SIZE = 64 * 1024
+
+# ijson이 없으면 잡을 파싱 예외도 없음
+_PARSE_ERRORS = (ijson.JSONError,) if ijson else ()
+
+_CONTAINER_START = ("start_map", "start_array")
+_CONTAINER_END = ("end_map", "end_array")
+
+
+def _lookup(document, path):
+    """점(.)으로 구분된 경로의 값 (없으면 None)"""
+    value = document
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+class _ResponseReader:
+    """iter_content를 ijson이 읽을 수 있는 파일 객체로 감쌈 (압축 해제 및 예외 변환은 requests가 처리)"""
+
+    def __init__(self, response):
+        self._chunks = response.iter_content(READ_CHUNK_SIZE)
+
+    def read(self, size=-1):
+        if size == 0:
+            return b""  # ijson이 바이트/문자열 여부를 확인할 때 청크를 소비하지 않도록
+        return next(self._chunks, b"")
+
+
+def _decode_whole(response, subtrees, items):
+    """ijson이 없을 때의 대체 경로 (응답 전체를 메모리에 올림)"""
+    document = response.json()
+    result = {}
+    for path, callback in items.items():
+        array_path = path[:-len(".item")]
+        array = _lookup(document, array_path)
+        for item in array or []:
+            callback(item)
+        # 하위 트리 결과에 배열이 남지 않도록 떼어냄
+        parent_path, _, key = array_path.rpartition(".")
+        parent = _lookup(document, parent_path) if parent_path else document
+        if isinstance(parent, dict):
+            parent.pop(key, None)
+    for path in subtrees:
+        value = _lookup(document, path)
+        if value is not None:
+            result[path] = value
+    return result
+
+
+def stream_json(response, subtrees=(), items=None):
+    """
+    응답 본문을 스트리밍으로 파싱하여 필요한 하위 트리만 생성
+
+    Args:
+        response: stream=True로 받은 requests 응답
+        subtrees: 통째로 만들 경로 리스트 (예: "data.dma_result")
+        items: {배열 경로 + ".item": 콜백} 배열 원소를 하나씩 콜백에 넘기고 모아두지 않음
+            (subtrees 안쪽 배열이면 해당 하위 트리에서는 제외됨)
+
+    Returns:
+        경로별 값 딕셔너리 (응답에 없는 경로는 포함하지 않음)
+    """
+    items = items or {}
+    try:
+        if ijson is None:
+            return _decode_whole(response, subtrees, items)
+
+        result = {}
+        builder = None  # (경로, ObjectBuilder, 깊이)
+        item_builder = None  # (콜백, ObjectBuilder, 깊이)
+
+        array_paths = {path[:-len(".item")] for path in items}
+
+        # use_float: bson이 Decimal을 저장하지 못하므로 실수는 float으로
+        for prefix, event, value in ijson.parse(_ResponseReader(response), use_float=True):
+            if item_builder is None and prefix in items:
+                if event in _CONTAINER_START:
+                    item_builder = (items[prefix], ijson.ObjectBuilder(), 0)
+                else:
+                    items[prefix](value)  # 스칼라 원소
+                    continue
+
+            if item_builder is not None:
+                callback, item_object, depth = item_builder
+                item_object.event(event, value)
+                depth += 1 if event in _CONTAINER_START else -1 if event in _CONTAINER_END else 0
+                if depth == 0:
+                    callback(item_object.value)
+                    item_builder = None
+                else:
+                    item_builder = (callback, item_object, depth)
+                continue
+
+            if prefix in array_paths:
+                continue  # 콜백으로 넘기는 배열 자체의 시작/끝 이벤트
+
+            if builder is None:
+                if prefix not in subtrees:
+                    continue
+                if event not in _CONTAINER_START:
+                    result[prefix] = value
+                    continue
+                builder = (prefix, ijson.ObjectBuilder(), 0)
+
+            path, subtree, depth = builder
+            subtree.event(event, value)
+            depth += 1 if event in _CONTAINER_START else -1 if event in _CONTAINER_END else 0
+            if depth == 0:
+                result[path] = subtree.value
+                builder = None
+            else:
+                builder = (path, subtree, depth)
+
+        return result
+    except _PARSE_ERRORS as e:
+        raise requests.exceptions.InvalidJSONError(f"응답 JSON 파싱 실패: {e}", response=response) from e
+    finally:
+        response.close()
+
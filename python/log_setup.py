@@ -0,0 +1,112 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from config import LOG_LEVEL, LOG_COUNTER_FLUSH_INTERVAL
+
+_state = {"listener": None, "flusher": None}
+_counters = Counter()
+_counters_lock = threading.Lock()
+_stop_flusher = threading.Event()
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    레코드를 포맷하지 않고 그대로 큐에 넣는 핸들러
+
+    기본 QueueHandler는 호출 스레드에서 메시지를 포맷하므로,
+    포맷과 I/O를 모두 리스너 스레드로 넘기기 위해 prepare를 생략한다.
+    (같은 프로세스 내 큐에서만 사용)
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON으로 변환"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage()
+        }
+        counts = getattr(record, "counts", None)
+        if counts:
+            entry["counts"] = counts
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def count_event(name, n=1):
+    """반복되는 항목별 이벤트를 로그 한 줄 대신 카운터로 집계 (주기적으로 요약 출력)"""
+    with _counters_lock:
+        _counters[name] += n
+
+
+def flush_counters():
+    """집계된 이벤트 카운터를 한 줄로 출력하고 초기화"""
+    with _counters_lock:
+        if not _counters:
+            return
+        counts = dict(_counters)
+        _counters.clear()
+    logging.info("이벤트 집계", extra={"counts": counts})
+
+
+def _flush_periodically(interval):
+    while not _stop_flusher.wait(interval):
+        flush_counters()
+
+
+def setup_logging(level=LOG_LEVEL, flush_interval=LOG_COUNTER_FLUSH_INTERVAL, stream=None):
+    """
+    큐 기반 비동기 로깅 설정 (여러 번 호출해도 한 번만 적용)
+
+    루트 로거에는 큐에 넣기만 하는 핸들러를 달고, 포맷과 출력은 리스너 스레드에서 JSON 라인으로 처리한다.
+    """
+    if _state["listener"]:
+        return
+
+    log_queue = queue.SimpleQueue()
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonLineFormatter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(LazyQueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    _state["listener"] = listener
+
+    flusher = threading.Thread(target=_flush_periodically, args=(flush_interval,), name="log-counter-flusher",
+                               daemon=True)
+    flusher.start()
+    _state["flusher"] = flusher
+
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """남은 카운터를 출력하고 큐에 쌓인 로그를 모두 기록한 뒤 리스너 종료"""
+    listener = _state["listener"]
+    if not listener:
+        return
+
+    _stop_flusher.set()
+    flush_counters()
+    listener.stop()
+    _state["listener"] = None
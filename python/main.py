@@ -1,16 +1,79 @@
+import argparse
+import logging
+
+from analytics_export import EXPORT_AVAILABLE, export_auction_outcomes
+from auction_summary import ensure_summary_indexes
+from config import (
+    USE_JOB_QUEUE, COLLECTION_NAME, AUCTION_SUMMARY_COLLECTION, AUCTION_STUDIES_COLLECTION, MARKET_STATS_COLLECTION
+)
 from fetch_list import fetch_auction_data
-from python.migrate_to_server import migrate_to_server
-from python.update_expired_auctions import update_expired_auctions
+from log_setup import setup_logging
+from migrate_to_server import migrate_collection
+from profiler import add_profile_arguments, enable_from_args
+from scheduler import run_budget
+from stage_runner import Stage, run_stages
+from update_expired_auctions import update_expired_auctions
+from worker import run_worker
 
-if __name__ == "__main__":
-    conditions = [
-        ("0004601", 0, 14),
-        ("0004602", 15, 60)
+# 목록 조회 조건 (검색 조건 코드, 시작 일수, 종료 일수)
+CONDITIONS = [
+    ("0004601", 0, 14),
+    ("0004602", 15, 60)
+]
+
+
+def build_stages():
+    """
+    배치 단계 의존 관계 구성
+
+    목록 수집과 기일 내역 갱신은 서로 다른 API와 문서를 다루므로 동시에 실행하고,
+    각 컬렉션의 마이그레이션은 해당 컬렉션을 쓰는 단계가 끝나는 대로 시작한다.
+    """
+    fetch_stages = [
+        Stage(f"fetch_{code}", lambda condition=(code, start, end): fetch_auction_data(*condition))
+        for code, start, end in CONDITIONS
     ]
-    # 신규 경매 데이터 패치
-    for condition in conditions:
-        fetch_auction_data(*condition)
-    # 경매 데이터 업데이트
-    update_expired_auctions()
+    # 신규 경매 데이터 패치 / 경매 데이터 업데이트
+    stages = fetch_stages + [Stage("update_expired", update_expired_auctions)]
+    writers = [stage.name for stage in stages]
+    study_writers = [stage.name for stage in fetch_stages]
+
+    # 작업 큐 사용 시 다른 노드의 워커와 함께 큐가 빌 때까지 처리
+    if USE_JOB_QUEUE:
+        stages.append(Stage("queue_worker", run_worker, depends_on=writers))
+        writers = writers + ["queue_worker"]
+        study_writers = study_writers + ["queue_worker"]
+
     # 로컬 to 서버 마이그레이션
-    migrate_to_server()
+    stages += [
+        Stage("migrate_auctions", lambda: migrate_collection(COLLECTION_NAME), depends_on=writers),
+        Stage("migrate_auction_studies", lambda: migrate_collection(AUCTION_STUDIES_COLLECTION), depends_on=study_writers),
+        Stage("migrate_auction_summary",
+              lambda: migrate_collection(AUCTION_SUMMARY_COLLECTION, ensure_indexes=ensure_summary_indexes),
+              depends_on=writers),
+        Stage("migrate_market_stats", lambda: migrate_collection(MARKET_STATS_COLLECTION), depends_on=writers)
+    ]
+
+    # 분석용 컬럼 파일 증분 내보내기 (로컬 디스크, pyarrow가 설치된 경우에만)
+    if EXPORT_AVAILABLE:
+        stages.append(Stage("export_analytics", export_auction_outcomes, depends_on=writers))
+    return stages
+
+
+if __name__ == "__main__":
+    stages = build_stages()
+
+    parser = argparse.ArgumentParser(description="법원경매 배치 실행")
+    parser.add_argument("--stages", nargs="*", choices=[stage.name for stage in stages],
+                        help="실행할 단계 (기본: 전체, 선택하지 않은 선행 단계는 완료된 것으로 간주)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    setup_logging()
+    enable_from_args(args)
+    if not EXPORT_AVAILABLE:
+        logging.info("pyarrow 패키지가 없어 분석용 내보내기 단계를 제외합니다")
+
+    # 실행 시간 예산 설정 (초과분은 deferred_work 컬렉션에 기록 후 다음 실행으로 이월)
+    run_budget.start()
+    run_stages(stages, selected=args.stages)
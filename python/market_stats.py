@@ -0,0 +1,135 @@
+import logging
+from collections import Counter
+
+from auction_dates import SALE_RESULT_CODE, FAILED_BID_RESULT_CODE, to_int
+from log_setup import count_event, setup_logging
+from storage import store
+
+# 통계 계산에 필요한 경매 필드
+STATS_SOURCE_PROJECTION = {
+    "csBaseInfo.cortOfcCd": 1,
+    "dspslGdsDxdyInfo.aeeEvlAmt": 1,
+    "dspslGdsDxdyInfo.sclsUtilCd": 1,
+    "gdsDspslObjctLst.adongSdNm": 1,
+    "gdsDspslObjctLst.adongSggNm": 1,
+    "gdsDspslDxdyLst": 1
+}
+
+
+def stats_key(auction):
+    """통계 문서 키 (법원, 시도, 시군구, 용도)"""
+    objects = auction.get("gdsDspslObjctLst") or [{}]
+    key_fields = {
+        "cortOfcCd": auction.get("csBaseInfo", {}).get("cortOfcCd"),
+        "adongSdNm": objects[0].get("adongSdNm"),
+        "adongSggNm": objects[0].get("adongSggNm"),
+        "sclsUtilCd": auction.get("dspslGdsDxdyInfo", {}).get("sclsUtilCd")
+    }
+    stats_id = "|".join(str(value or "") for value in key_fields.values())
+    return stats_id, key_fields
+
+
+def date_list_contribution(dates, appraisal_amount):
+    """
+    기일 내역 리스트 하나가 통계에 기여하는 값
+
+    - saleCount / failedBidCount: 매각 / 유찰 기일 수
+    - resultedAuctionCount / soldAuctionCount: 결과가 있는 / 매각된 경매 수 (0 또는 1)
+    - failedRoundsAtSaleSum: 매각 전까지 유찰된 횟수 (매각된 경우)
+    - saleAmountSum, appraisalAmountSum, saleToAppraisalSum, saleToAppraisalCount: 매각가율 계산용
+    """
+    contribution = {}
+    failed_rounds = 0
+    for entry in dates or []:
+        result_code = entry.get("auctnDxdyRsltCd")
+        if result_code == FAILED_BID_RESULT_CODE:
+            contribution["failedBidCount"] = contribution.get("failedBidCount", 0) + 1
+            failed_rounds += 1
+        elif result_code == SALE_RESULT_CODE:
+            contribution["saleCount"] = contribution.get("saleCount", 0) + 1
+            if contribution.get("soldAuctionCount"):
+                continue  # 재매각은 매각 횟수만 반영
+
+            contribution["soldAuctionCount"] = 1
+            contribution["failedRoundsAtSaleSum"] = failed_rounds
+            sale_amount = to_int(entry.get("dspslAmt"))
+            if sale_amount:
+                contribution["saleAmountSum"] = sale_amount
+                if appraisal_amount:
+                    contribution["appraisalAmountSum"] = appraisal_amount
+                    contribution["saleToAppraisalSum"] = sale_amount / appraisal_amount
+                    contribution["saleToAppraisalCount"] = 1
+
+    if contribution:
+        contribution["resultedAuctionCount"] = 1
+    return contribution
+
+
+def record_date_changes(auction, old_dates, new_dates):
+    """
+    기일 내역 변경분만큼 시장 통계 갱신
+
+    이전/새 기일 내역의 기여분 차이만 반영하므로 같은 결과를 여러 번 기록해도 중복 집계되지 않는다.
+    """
+    appraisal_amount = to_int(auction.get("dspslGdsDxdyInfo", {}).get("aeeEvlAmt"))
+    old = date_list_contribution(old_dates, appraisal_amount)
+    new = date_list_contribution(new_dates, appraisal_amount)
+
+    increments = {}
+    for field in set(old) | set(new):
+        delta = new.get(field, 0) - old.get(field, 0)
+        if delta:
+            increments[field] = delta
+    if not increments:
+        return
+
+    stats_id, key_fields = stats_key(auction)
+    store.increment_market_stats(stats_id, key_fields, increments)
+    count_event("market_stats_updated")
+
+
+def record_auction_replaced(old_auction, new_auction):
+    """
+    경매 문서를 새 상세 정보로 교체할 때 시장 통계 갱신
+
+    통계 키나 감정가가 바뀌면 이전 문서의 기여분을 빼고 새 문서의 기여분을 더한다.
+    """
+    old_dates = old_auction.get("gdsDspslDxdyLst")
+    new_dates = new_auction.get("gdsDspslDxdyLst")
+    same_key = stats_key(old_auction)[0] == stats_key(new_auction)[0]
+    same_appraisal = (to_int(old_auction.get("dspslGdsDxdyInfo", {}).get("aeeEvlAmt"))
+                      == to_int(new_auction.get("dspslGdsDxdyInfo", {}).get("aeeEvlAmt")))
+    if same_key and same_appraisal:
+        record_date_changes(old_auction, old_dates, new_dates)
+    else:
+        record_date_changes(old_auction, old_dates, None)
+        record_date_changes(new_auction, None, new_dates)
+
+
+def rebuild_market_stats(log_every=1000):
+    """전체 경매 문서로부터 시장 통계를 다시 집계 (최초 적재 및 복구용)"""
+    store.clear_market_stats()
+
+    # 키별로 메모리에서 합산한 뒤 통계 문서마다 한 번씩 기록
+    totals = {}
+    total = 0
+    for auction in store.iter_auctions(STATS_SOURCE_PROJECTION):
+        total += 1
+        if total % log_every == 0:
+            logging.info("시장 통계 재집계 진행 상황: %d건", total)
+
+        appraisal_amount = to_int(auction.get("dspslGdsDxdyInfo", {}).get("aeeEvlAmt"))
+        contribution = date_list_contribution(auction.get("gdsDspslDxdyLst"), appraisal_amount)
+        if contribution:
+            stats_id, key_fields = stats_key(auction)
+            totals.setdefault(stats_id, (key_fields, Counter()))[1].update(contribution)
+
+    for stats_id, (key_fields, counts) in totals.items():
+        store.increment_market_stats(stats_id, key_fields, dict(counts))
+
+    logging.info("시장 통계 재집계 완료: 경매 %d건, 통계 문서 %d건", total, len(totals))
+
+
+if __name__ == "__main__":
+    setup_logging()
+    rebuild_market_stats()
@@ -1,10 +1,16 @@
 from pymongo import MongoClient
-from config import MONGO_URI, SERVER_MONGO_URI, DB_NAME, COLLECTION_NAME
+from auction_summary import ensure_summary_indexes
+from config import (
+    MONGO_URI, SERVER_MONGO_URI, DB_NAME, COLLECTION_NAME, AUCTION_SUMMARY_COLLECTION, AUCTION_STUDIES_COLLECTION,
+    MARKET_STATS_COLLECTION, STAGING_BACKEND, STAGING_SQLITE_PATH
+)
+from profiler import add_profile_arguments, enable_from_args, profile_stage
+from log_setup import setup_logging
+from storage import BACKEND_MONGO, store
+import argparse
 import logging
 import traceback
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 def test_connection(uri, name=""):
@@ -19,22 +25,20 @@ def test_connection(uri, name=""):
     finally:
         client.close()
 
-def migrate_collection(collection_name):
-    local_client = None
+def migrate_collection(collection_name, ensure_indexes=None):
+    """
+    스테이징 저장소(로컬 MongoDB 또는 SQLite)의 컬렉션을 서버로 복사
+    ensure_indexes: 서버 컬렉션에 인덱스를 생성하는 함수 (선택)
+    """
     server_client = None
     
     try:
         # 연결 테스트
         logger.info("MongoDB 연결 테스트 중...")
-        if not test_connection(MONGO_URI, "로컬"):
+        if STAGING_BACKEND == BACKEND_MONGO and not test_connection(MONGO_URI, "로컬"):
             raise Exception("로컬 MongoDB 연결 실패")
         if not test_connection(SERVER_MONGO_URI, "서버"):
             raise Exception("서버 MongoDB 연결 실패")
-            
-        # 로컬 MongoDB 연결
-        local_client = MongoClient(MONGO_URI)
-        local_db = local_client[DB_NAME]
-        local_collection = local_db[collection_name]
         
         # 서버 MongoDB 연결
         server_client = MongoClient(SERVER_MONGO_URI)
@@ -44,17 +48,19 @@ def migrate_collection(collection_name):
         # 기존 서버 컬렉션 데이터 삭제
         logger.info(f"서버의 {collection_name} 컬렉션 기존 데이터 삭제 중...")
         server_collection.delete_many({})
+
+        if ensure_indexes:
+            ensure_indexes(server_collection)
         
         # 배치 크기 설정
         BATCH_SIZE = 1000
         total_documents = 0
+        sample_local = None
         
-        # 배치 단위로 데이터 처리
-        while True:
-            # 현재 배치의 데이터 가져오기
-            batch = list(local_collection.find({}).skip(total_documents).limit(BATCH_SIZE))
-            if not batch:
-                break
+        # 배치 단위로 데이터 처리 (_id 순서로 읽어 skip 없이 이어서 조회)
+        for batch in store.iter_batches(collection_name, BATCH_SIZE):
+            if sample_local is None:
+                sample_local = batch[0]
                 
             # 서버에 배치 데이터 삽입
             server_collection.insert_many(batch)
@@ -63,7 +69,6 @@ def migrate_collection(collection_name):
         
         if total_documents > 0:
             # ID 보존 검증
-            sample_local = local_collection.find_one({})
             if sample_local:
                 sample_server = server_collection.find_one({"_id": sample_local["_id"]})
                 if sample_server:
@@ -80,15 +85,16 @@ def migrate_collection(collection_name):
     
     finally:
         # 연결 종료
-        if local_client:
-            local_client.close()
         if server_client:
             server_client.close()
 
 def migrate_to_server():
     try:
         # 설정 값 출력
-        logger.info(f"로컬 MongoDB URI: {MONGO_URI}")
+        if STAGING_BACKEND == BACKEND_MONGO:
+            logger.info(f"로컬 MongoDB URI: {MONGO_URI}")
+        else:
+            logger.info(f"로컬 스테이징 저장소: {STAGING_BACKEND} ({STAGING_SQLITE_PATH})")
         logger.info(f"서버 MongoDB URI: {SERVER_MONGO_URI}")
         logger.info(f"데이터베이스: {DB_NAME}")
         
@@ -98,8 +104,16 @@ def migrate_to_server():
         
         # auction_studies 컬렉션 마이그레이션
         logger.info("auction_studies 컬렉션 마이그레이션 시작...")
-        migrate_collection("auction_studies")
-        
+        migrate_collection(AUCTION_STUDIES_COLLECTION)
+
+        # auction_summary 컬렉션 마이그레이션 (서버에서 지도/목록 조회용 인덱스 생성)
+        logger.info("auction_summary 컬렉션 마이그레이션 시작...")
+        migrate_collection(AUCTION_SUMMARY_COLLECTION, ensure_indexes=ensure_summary_indexes)
+
+        # market_stats 컬렉션 마이그레이션 (대시보드 조회용)
+        logger.info("market_stats 컬렉션 마이그레이션 시작...")
+        migrate_collection(MARKET_STATS_COLLECTION)
+
         logger.info("모든 컬렉션의 마이그레이션이 완료되었습니다.")
         
     except Exception as e:
@@ -107,4 +121,11 @@ def migrate_to_server():
         logger.error(f"상세 에러: {traceback.format_exc()}")
         
 if __name__ == "__main__":
-    migrate_to_server()
+    parser = argparse.ArgumentParser(description="로컬 MongoDB 데이터를 서버로 마이그레이션")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    setup_logging()
+    enable_from_args(args)
+    with profile_stage("migrate_to_server"):
+        migrate_to_server()
@@ -0,0 +1,205 @@
+import cProfile
+import json
+import linecache
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL
+
+try:
+    import resource
+except ImportError:  # Windows에서는 최대 메모리 사용량을 보고하지 않음
+    resource = None
+
+# 프로파일링 모드
+MODE_SAMPLE = "sample"  # 스택 샘플링 (오버헤드가 낮아 운영 실행에 사용 가능)
+MODE_CPROFILE = "cprofile"  # cProfile 기반 결정적 프로파일링 (정밀하지만 느림)
+
+# 경로 기준 시간 분류 (스택에 해당 경로가 있으면 그 분류로 집계)
+HTTP_PATH_MARKERS = ("/requests/", "/urllib3/", "/http/client.py", "/socket.py", "/ssl.py")
+MONGO_PATH_MARKERS = ("/pymongo/", "/bson/")
+
+_settings = {"mode": None, "output_dir": PROFILE_DIR}
+
+# cProfile을 사용 중인 단계가 있는지 (프로세스 전체에서 하나만 사용)
+_cprofile_lock = threading.Lock()
+
+
+def enable(mode=MODE_SAMPLE, output_dir=None):
+    """프로파일링 활성화 (mode가 None이면 비활성화)"""
+    _settings["mode"] = mode
+    if output_dir:
+        _settings["output_dir"] = output_dir
+    if mode:
+        os.makedirs(_settings["output_dir"], exist_ok=True)
+        logging.info(f"프로파일링 활성화: 모드 {mode}, 출력 경로 {_settings['output_dir']}")
+
+
+def add_profile_arguments(parser):
+    """argparse 파서에 프로파일링 옵션 추가"""
+    parser.add_argument("--profile", nargs="?", const=MODE_SAMPLE, choices=[MODE_SAMPLE, MODE_CPROFILE],
+                        help="단계별 프로파일링 활성화 (기본: sample)")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="프로파일 결과 저장 경로")
+
+
+def enable_from_args(args):
+    """add_profile_arguments로 파싱한 옵션 적용"""
+    if args.profile:
+        enable(args.profile, args.profile_dir)
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 메모리 사용량 (MB, 측정할 수 없으면 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _classify(frames):
+    """샘플 스택(바깥→안쪽 순)을 HTTP, Mongo, sleep, Python 중 하나로 분류"""
+    filename, lineno, _ = frames[-1]
+    if "sleep(" in linecache.getline(filename, lineno):
+        return "sleep"
+    # pymongo도 TLS 연결에서 ssl.py/socket.py를 거치므로 Mongo 경로를 먼저 확인
+    if any(marker in frame[0] for frame in frames for marker in MONGO_PATH_MARKERS):
+        return "mongo"
+    if any(marker in frame[0] for frame in frames for marker in HTTP_PATH_MARKERS):
+        return "http"
+    return "python"
+
+
+class StackSampler:
+    """대상 스레드의 스택을 주기적으로 샘플링하여 collapsed stack 및 시간 분류 집계"""
+
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.categories = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append((code.co_filename, frame.f_lineno, code.co_name))
+                frame = frame.f_back
+            frames.reverse()
+
+            self.categories[_classify(frames)] += 1
+            self.stacks[";".join(
+                f"{name} ({os.path.basename(filename)}:{lineno})" for filename, lineno, name in frames
+            )] += 1
+
+
+def _start_cprofile(stage):
+    """cProfile 시작 (다른 단계가 사용 중이거나 시작할 수 없으면 None)"""
+    # Python 3.12부터 프로세스에 프로파일러가 하나만 켜질 수 있으므로 동시에 실행되는 단계는 하나만 사용
+    if not _cprofile_lock.acquire(blocking=False):
+        logging.info(f"[{stage}] 다른 단계가 cProfile 사용 중이므로 sample 모드로 프로파일링")
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as e:  # 디버거, coverage 등 다른 프로파일링 도구가 이미 사용 중
+        _cprofile_lock.release()
+        logging.warning(f"[{stage}] cProfile 시작 실패, sample 모드로 프로파일링: {e}")
+        return None
+    return profile
+
+
+def _finish_cprofile(profile, stage, prefix, started):
+    profile.disable()
+    _cprofile_lock.release()
+    try:
+        profile.dump_stats(f"{prefix}.prof")
+    except OSError as e:
+        logging.warning(f"[{stage}] 프로파일 저장 실패: {e}")
+        return
+    logging.info(f"[{stage}] 프로파일 저장: {prefix}.prof, 소요 시간 {time.perf_counter() - started:.1f}초")
+
+
+def _finish_sampler(sampler, stage, prefix, started):
+    sampler.stop()
+    wall = time.perf_counter() - started
+    samples = sum(sampler.categories.values())
+
+    # 샘플 비율로 실제 경과 시간을 분류별로 배분
+    breakdown = {
+        category: round(wall * count / samples, 3) if samples else 0.0
+        for category, count in sampler.categories.items()
+    }
+    try:
+        with open(f"{prefix}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        with open(f"{prefix}.json", "w", encoding="utf-8") as f:
+            json.dump({"stage": stage, "wall_seconds": round(wall, 3), "samples": samples,
+                       "interval": sampler.interval, "breakdown_seconds": breakdown}, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logging.warning(f"[{stage}] 프로파일 저장 실패: {e}")
+        return
+
+    logging.info(f"[{stage}] 프로파일 저장: {prefix}.collapsed, 소요 시간 {wall:.1f}초, 분류: {breakdown}")
+
+
+@contextmanager
+def profile_stage(stage):
+    """
+    배치 단계를 프로파일링 (비활성화 상태면 아무것도 하지 않음)
+
+    sample 모드는 `<stage>.collapsed`(flamegraph.pl/speedscope 입력)와
+    `<stage>.json`(HTTP/Mongo/sleep/Python 시간 분류)을, cprofile 모드는 `<stage>.prof`를 저장한다.
+    cProfile은 프로세스에 하나만 켤 수 있으므로 동시에 실행되는 다른 단계는 sample 모드로 대체된다.
+    프로파일러 시작/저장 오류는 경고만 남기고 단계 실행에는 영향을 주지 않는다.
+    """
+    mode = _settings["mode"]
+    if not mode:
+        yield
+        return
+
+    prefix = os.path.join(_settings["output_dir"], f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{stage}")
+    started = time.perf_counter()
+
+    profile = _start_cprofile(stage) if mode == MODE_CPROFILE else None
+    if profile is not None:
+        try:
+            yield
+        finally:
+            _finish_cprofile(profile, stage, prefix, started)
+        return
+
+    sampler = StackSampler(threading.get_ident())
+    try:
+        sampler.start()
+    except RuntimeError as e:  # 스레드를 더 만들 수 없는 경우
+        logging.warning(f"[{stage}] 스택 샘플러 시작 실패, 프로파일링 없이 실행: {e}")
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        _finish_sampler(sampler, stage, prefix, started)
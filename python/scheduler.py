@@ -0,0 +1,60 @@
+import logging
+import re
+import time
+from datetime import datetime
+
+from config import RUN_TIME_BUDGET
+
+# 날짜를 알 수 없는 작업의 기일 거리 (가장 낮은 우선순위)
+UNKNOWN_DUE_DAYS = 9999
+
+
+class RunBudget:
+    """배치 실행 전체에 적용되는 시간 예산"""
+
+    def __init__(self):
+        self.started_at = None
+        self.deadline = None
+
+    def start(self, seconds=RUN_TIME_BUDGET):
+        """시간 예산 시작 (seconds가 None이면 무제한)"""
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + seconds if seconds else None
+        if self.deadline:
+            logging.info(f"배치 시간 예산 설정: {seconds}초")
+
+    def remaining(self):
+        """남은 시간 (초), 예산이 없으면 None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exhausted(self):
+        """시간 예산 소진 여부"""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+
+# main.py 실행 전체가 공유하는 시간 예산 (모듈 단독 실행 시에는 무제한)
+run_budget = RunBudget()
+
+
+def days_until(ymd):
+    """YYYYMMDD 형식 기일까지 남은 일수 (지난 날짜는 음수, 파싱 실패 시 None)"""
+    digits = re.sub(r"\D", "", ymd or "")[:8]
+    try:
+        due = datetime.strptime(digits, "%Y%m%d")
+    except ValueError:
+        return None
+    return (due.date() - datetime.today().date()).days
+
+
+def urgency_key(due_ymd, last_checked_at=None):
+    """
+    작업 우선순위 정렬 키 (작을수록 긴급)
+
+    1순위: 기일이 오늘과 가까운 순 (임박한 매각기일, 막 지난 기일의 결과)
+    2순위: 기일 내역을 마지막으로 확인한 지 오래된 순 (미확인 우선)
+    """
+    days = days_until(due_ymd)
+    distance = abs(days) if days is not None else UNKNOWN_DUE_DAYS
+    return distance, last_checked_at or datetime.min
@@ -0,0 +1,138 @@
+import logging
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+from config import STAGE_RUNS_COLLECTION
+from profiler import peak_rss_mb, profile_stage
+from storage import store
+
+# 단계 실행 결과
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILED = "failed"
+OUTCOME_SKIPPED = "skipped"  # 선행 단계 실패로 실행하지 않음
+
+
+class Stage:
+    """배치 실행 단계 (선행 단계가 모두 성공해야 실행)"""
+
+    def __init__(self, name, func, depends_on=()):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+
+
+def _critical_path(stages, results):
+    """가장 늦게 끝난 단계부터 가장 늦게 끝난 선행 단계를 따라가며 임계 경로 계산"""
+    finished = {name: result for name, result in results.items() if result.get("finishedAt") is not None}
+    if not finished:
+        return []
+
+    path = [max(finished, key=lambda name: finished[name]["finishedAt"])]
+    while True:
+        deps = [dep for dep in stages[path[-1]].depends_on if dep in finished]
+        if not deps:
+            break
+        path.append(max(deps, key=lambda name: finished[name]["finishedAt"]))
+    return list(reversed(path))
+
+
+def _run_stage(stage):
+    started = time.monotonic()
+    try:
+        with profile_stage(stage.name):
+            stage.func()
+        outcome, error = OUTCOME_SUCCESS, None
+    except Exception as e:
+        logging.error(f"[{stage.name}] 단계 실패: {e}\n{traceback.format_exc()}")
+        outcome, error = OUTCOME_FAILED, str(e)
+    # 프로세스 단위 최대값이므로 단계가 끝난 시점까지의 최대 메모리 사용량
+    return {"outcome": outcome, "error": error, "startedAt": started, "finishedAt": time.monotonic(),
+            "peakRssMb": peak_rss_mb()}
+
+
+def run_stages(stage_list, selected=None, max_workers=4):
+    """
+    의존 관계에 따라 단계를 실행 (서로 독립적인 단계는 동시에 실행)
+
+    Args:
+        stage_list: Stage 리스트
+        selected: 실행할 단계 이름 리스트 (None이면 전체, 선택되지 않은 선행 단계는 완료된 것으로 간주)
+        max_workers: 동시에 실행할 최대 단계 수
+
+    Returns:
+        단계 이름별 실행 결과 딕셔너리
+    """
+    stages = {stage.name: stage for stage in stage_list}
+    unknown = [name for name in (selected or []) if name not in stages]
+    if unknown:
+        raise ValueError(f"알 수 없는 단계: {unknown} (가능한 단계: {list(stages)})")
+
+    to_run = set(selected or stages)
+    results = {}
+    running = {}
+    run_started = time.monotonic()
+    started_at = datetime.now()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as executor:
+        while to_run or running:
+            progressed = False
+            for name in sorted(to_run):
+                running_names = set(running.values())
+                deps = [dep for dep in stages[name].depends_on if dep in to_run or dep in running_names or dep in results]
+                if any(dep in to_run or dep in running_names for dep in deps):
+                    continue  # 선행 단계가 아직 끝나지 않음
+
+                to_run.discard(name)
+                progressed = True
+                if any(results[dep]["outcome"] != OUTCOME_SUCCESS for dep in deps):
+                    logging.warning(f"[{name}] 선행 단계 실패로 건너뜀")
+                    results[name] = {"outcome": OUTCOME_SKIPPED, "error": None, "startedAt": None, "finishedAt": None}
+                    continue
+
+                logging.info(f"[{name}] 단계 시작")
+                running[executor.submit(_run_stage, stages[name])] = name
+
+            if not running:
+                if to_run and not progressed:
+                    raise ValueError(f"순환 의존 관계가 있는 단계: {sorted(to_run)}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                logging.info(f"[{name}] 단계 종료: {results[name]['outcome']}, "
+                             f"소요 시간 {results[name]['finishedAt'] - results[name]['startedAt']:.1f}초, "
+                             f"최대 메모리 사용량 {results[name]['peakRssMb']}MB")
+
+    total = time.monotonic() - run_started
+    critical_path = _critical_path(stages, results)
+    logging.info(f"전체 단계 완료: 소요 시간 {total:.1f}초, 최대 메모리 사용량 {peak_rss_mb()}MB, "
+                 f"임계 경로: {' → '.join(critical_path)}")
+    _save_stage_run(started_at, total, results, critical_path, run_started)
+    return results
+
+
+def _save_stage_run(started_at, total, results, critical_path, run_started):
+    """단계별 실행 결과를 stage_runs 컬렉션에 기록"""
+    stage_records = []
+    for name, result in results.items():
+        record = {"name": name, "outcome": result["outcome"], "error": result["error"]}
+        if result["startedAt"] is not None:
+            record["offsetSeconds"] = round(result["startedAt"] - run_started, 3)
+            record["durationSeconds"] = round(result["finishedAt"] - result["startedAt"], 3)
+            record["peakRssMb"] = result["peakRssMb"]
+        stage_records.append(record)
+
+    try:
+        store.insert_documents(STAGE_RUNS_COLLECTION, [{
+            "startedAt": started_at,
+            "durationSeconds": round(total, 3),
+            "criticalPath": critical_path,
+            "peakRssMb": peak_rss_mb(),
+            "stages": stage_records
+        }])
+    except Exception as e:
+        logging.error(f"단계 실행 기록 저장 실패: {e}")
@@ -0,0 +1,536 @@
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from bson import ObjectId, json_util
+from bson.json_util import JSONOptions, JSONMode
+from pymongo import MongoClient, ASCENDING, ReplaceOne
+
+from config import (
+    MONGO_URI, DB_NAME, COLLECTION_NAME, AUCTION_IMAGES_COLLECTION, AUCTION_SUMMARY_COLLECTION,
+    AUCTION_STUDIES_COLLECTION, MARKET_STATS_COLLECTION, STAGING_BACKEND, STAGING_SQLITE_PATH
+)
+
+# 스테이징 저장소 종류
+BACKEND_MONGO = "mongo"
+BACKEND_SQLITE = "sqlite"
+
+
+class StagingStore(ABC):
+    """
+    배치가 서버로 옮기기 전에 데이터를 쌓아두는 스테이징 저장소 인터페이스
+
+    문서는 MongoDB 문서 구조(_id는 ObjectId)를 그대로 유지하므로
+    어떤 백엔드를 사용하든 migrate_to_server로 동일하게 서버에 옮길 수 있다.
+    """
+
+    @abstractmethod
+    def find_auction(self, bo_cd, user_cs_no, dspsl_gds_seq):
+        """중복 검사 키(법원 코드, 사건번호, 매물번호)로 경매 문서 조회"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_auction(self, auction_id, projection=None):
+        """ID로 경매 문서 조회 (projection은 Mongo에서만 적용, 나머지 백엔드는 전체 문서 반환)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_auctions_by_ids(self, auction_ids, projection=None):
+        """여러 ID의 경매 문서 조회"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_auctions(self, projection=None):
+        """전체 경매 문서 순회"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_auction(self, doc):
+        """경매 문서 저장 후 ID 반환"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_auction(self, auction_id, fields):
+        """경매 문서의 최상위 필드 갱신 ($set), 변경 여부 반환"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_expired_auctions(self, today_str, projection=None):
+        """기일이 지났지만 결과가 없는 기일이 있는 (취소되지 않은) 경매 문서 조회"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_images(self, docs):
+        """이미지 문서 저장 후 ID 리스트 반환"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_images(self, image_ids):
+        """이미지 문서 삭제"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def study_exists(self, bo_cd, cs_no):
+        """현황조사서 중복 검사"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_study(self, doc):
+        """현황조사서 문서 저장"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert_summary(self, doc):
+        """경매 요약 문서 저장 (같은 ID가 있으면 교체)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert_summaries(self, docs):
+        """경매 요약 문서 일괄 저장 (재생성용)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_summary(self, auction_id):
+        """경매 요약 문서 삭제"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear_summaries(self):
+        """경매 요약 문서 전체 삭제"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_summary_ids_updated(self, since, until):
+        """updatedAt이 (since, until] 구간인 요약 문서 ID 리스트 (since가 None이면 처음부터)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def increment_market_stats(self, stats_id, key_fields, increments):
+        """시장 통계 문서의 카운터 증감 (문서가 없으면 key_fields로 생성)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear_market_stats(self):
+        """시장 통계 문서 전체 삭제"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_documents(self, collection_name, docs):
+        """기록용 문서 저장 (deferred_work, stage_runs 등)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert_documents(self, collection_name, docs):
+        """기록용 문서 저장 (같은 _id가 있으면 교체)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_documents(self, collection_name, field, value):
+        """기록용 문서 중 field 값이 value인 문서 삭제"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_batches(self, collection_name, batch_size):
+        """마이그레이션용으로 컬렉션 문서를 _id 순서대로 배치 단위 반환"""
+        raise NotImplementedError
+
+
+class MongoStagingStore(StagingStore):
+    """로컬 MongoDB 스테이징 저장소"""
+
+    def __init__(self, uri=MONGO_URI):
+        self.client = MongoClient(uri)
+        self.db = self.client[DB_NAME]
+        self.auctions = self.db[COLLECTION_NAME]
+        self.images = self.db[AUCTION_IMAGES_COLLECTION]
+        self.studies = self.db[AUCTION_STUDIES_COLLECTION]
+        self.summaries = self.db[AUCTION_SUMMARY_COLLECTION]
+        self.market_stats = self.db[MARKET_STATS_COLLECTION]
+        self._indexes_ready = False
+
+    def _ensure_indexes(self):
+        """중복 검사 키 및 조회 조건 인덱스 생성 (최초 1회)"""
+        if self._indexes_ready:
+            return
+        self.auctions.create_index([
+            ("csBaseInfo.cortOfcCd", ASCENDING),
+            ("csBaseInfo.userCsNo", ASCENDING),
+            ("dspslGdsDxdyInfo.dspslGdsSeq", ASCENDING)
+        ])
+        self.studies.create_index([("reference.cortOfcCd", ASCENDING), ("reference.csNo", ASCENDING)])
+        self.images.create_index([("auction_id", ASCENDING)])
+        self.summaries.create_index([("updatedAt", ASCENDING)])
+        self._indexes_ready = True
+
+    def find_auction(self, bo_cd, user_cs_no, dspsl_gds_seq):
+        self._ensure_indexes()
+        return self.auctions.find_one({
+            "csBaseInfo.userCsNo": user_cs_no,
+            "dspslGdsDxdyInfo.dspslGdsSeq": dspsl_gds_seq,
+            "csBaseInfo.cortOfcCd": bo_cd
+        })
+
+    def get_auction(self, auction_id, projection=None):
+        return self.auctions.find_one({"_id": auction_id}, projection)
+
+    def find_auctions_by_ids(self, auction_ids, projection=None):
+        return list(self.auctions.find({"_id": {"$in": list(auction_ids)}}, projection))
+
+    def iter_auctions(self, projection=None):
+        return self.auctions.find({}, projection)
+
+    def insert_auction(self, doc):
+        return self.auctions.insert_one(doc).inserted_id
+
+    def update_auction(self, auction_id, fields):
+        return self.auctions.update_one({"_id": auction_id}, {"$set": fields}).modified_count > 0
+
+    def find_expired_auctions(self, today_str, projection=None):
+        return list(self.auctions.find({
+            "gdsDspslDxdyLst": {
+                "$elemMatch": {
+                    "dxdyYmd": {"$lt": today_str},
+                    "auctnDxdyRsltCd": None
+                }
+            },
+            # 이미 취소 처리된 경매는 제외
+            "isAuctionCancelled": {"$ne": True}
+        }, projection))
+
+    def insert_images(self, docs):
+        return self.images.insert_many(docs).inserted_ids
+
+    def delete_images(self, image_ids):
+        if image_ids:
+            self.images.delete_many({"_id": {"$in": list(image_ids)}})
+
+    def study_exists(self, bo_cd, cs_no):
+        self._ensure_indexes()
+        return self.studies.find_one({"reference.cortOfcCd": bo_cd, "reference.csNo": cs_no}, {"_id": 1}) is not None
+
+    def insert_study(self, doc):
+        self.studies.insert_one(doc)
+
+    def upsert_summary(self, doc):
+        self._ensure_indexes()
+        self.summaries.replace_one({"_id": doc["_id"]}, doc, upsert=True)
+
+    def upsert_summaries(self, docs):
+        if docs:
+            self._ensure_indexes()
+            self.summaries.bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs],
+                                      ordered=False)
+
+    def delete_summary(self, auction_id):
+        self.summaries.delete_one({"_id": auction_id})
+
+    def clear_summaries(self):
+        self.summaries.delete_many({})
+
+    def find_summary_ids_updated(self, since, until):
+        query = {"updatedAt": {"$lte": until}}
+        if since:
+            query["updatedAt"]["$gt"] = since
+        return [doc["_id"] for doc in self.summaries.find(query, {"_id": 1})]
+
+    def increment_market_stats(self, stats_id, key_fields, increments):
+        self.market_stats.update_one(
+            {"_id": stats_id},
+            {"$inc": increments, "$setOnInsert": key_fields, "$currentDate": {"updatedAt": True}},
+            upsert=True
+        )
+
+    def clear_market_stats(self):
+        self.market_stats.delete_many({})
+
+    def insert_documents(self, collection_name, docs):
+        if docs:
+            self.db[collection_name].insert_many(docs)
+
+    def upsert_documents(self, collection_name, docs):
+        if docs:
+            self.db[collection_name].bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs], ordered=False)
+
+    def delete_documents(self, collection_name, field, value):
+        self.db[collection_name].delete_many({field: value})
+
+    def iter_batches(self, collection_name, batch_size):
+        batch = []
+        for doc in self.db[collection_name].find({}).sort("_id", ASCENDING).batch_size(batch_size):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+# SQLite 문서 직렬화 설정 (ObjectId, datetime 보존)
+_JSON_OPTIONS = JSONOptions(json_mode=JSONMode.RELAXED, tz_aware=False)
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+);
+CREATE TABLE IF NOT EXISTS auctions (
+    id TEXT PRIMARY KEY,
+    cort_ofc_cd TEXT,
+    user_cs_no TEXT,
+    dspsl_gds_seq INTEGER,
+    pending_dxdy_ymd TEXT,
+    cancelled INTEGER NOT NULL DEFAULT 0,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_auctions_dedup ON auctions (cort_ofc_cd, user_cs_no, dspsl_gds_seq);
+CREATE INDEX IF NOT EXISTS idx_auctions_pending ON auctions (pending_dxdy_ymd) WHERE cancelled = 0;
+CREATE TABLE IF NOT EXISTS auction_studies (
+    id TEXT PRIMARY KEY,
+    cort_ofc_cd TEXT,
+    cs_no TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_studies_dedup ON auction_studies (cort_ofc_cd, cs_no);
+CREATE TABLE IF NOT EXISTS auction_summary (
+    id TEXT PRIMARY KEY,
+    updated_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_summary_updated ON auction_summary (updated_at);
+"""
+
+
+def _dumps(doc):
+    return json_util.dumps(doc, json_options=_JSON_OPTIONS, ensure_ascii=False)
+
+
+def _loads(text):
+    return json_util.loads(text, json_options=_JSON_OPTIONS)
+
+
+def _timestamp(value):
+    """정렬 가능한 문자열 시각 (isoformat은 마이크로초가 0이면 생략하므로 직접 포맷)"""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f") if value else None
+
+
+def _pending_dxdy_ymd(doc):
+    """결과가 없는 기일 중 가장 이른 날짜 (기일 지난 경매 조회용)"""
+    pending = [entry.get("dxdyYmd") for entry in doc.get("gdsDspslDxdyLst") or []
+               if entry.get("auctnDxdyRsltCd") is None and entry.get("dxdyYmd")]
+    return min(pending) if pending else None
+
+
+class SqliteStagingStore(StagingStore):
+    """
+    단일 파일 SQLite 스테이징 저장소 (mongod 없이 실행할 때 사용)
+
+    문서는 확장 JSON으로 저장하고, 중복 검사 키와 기일 조회 조건은 인덱스가 있는 별도 컬럼으로 관리한다.
+    경매, 현황조사서, 요약 외의 컬렉션(이미지, 기록용 문서)은 공용 documents 테이블에 저장한다.
+    """
+
+    def __init__(self, path=STAGING_SQLITE_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SQLITE_SCHEMA)
+        self.conn.commit()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self.conn:
+            return self.conn.execute(sql, params)
+
+    def _executemany(self, sql, rows):
+        with self._lock, self.conn:
+            self.conn.executemany(sql, rows)
+
+    @staticmethod
+    def _auction_row(doc):
+        base = doc.get("csBaseInfo", {})
+        return (str(doc["_id"]), base.get("cortOfcCd"), base.get("userCsNo"),
+                doc.get("dspslGdsDxdyInfo", {}).get("dspslGdsSeq"), _pending_dxdy_ymd(doc),
+                1 if doc.get("isAuctionCancelled") else 0, _dumps(doc))
+
+    def find_auction(self, bo_cd, user_cs_no, dspsl_gds_seq):
+        rows = self._query(
+            "SELECT doc FROM auctions WHERE cort_ofc_cd = ? AND user_cs_no = ? AND dspsl_gds_seq = ? LIMIT 1",
+            (bo_cd, user_cs_no, dspsl_gds_seq)
+        )
+        return _loads(rows[0][0]) if rows else None
+
+    def get_auction(self, auction_id, projection=None):
+        rows = self._query("SELECT doc FROM auctions WHERE id = ?", (str(auction_id),))
+        return _loads(rows[0][0]) if rows else None
+
+    def find_auctions_by_ids(self, auction_ids, projection=None):
+        ids = [str(auction_id) for auction_id in auction_ids]
+        if not ids:
+            return []
+        rows = self._query(f"SELECT doc FROM auctions WHERE id IN ({','.join('?' * len(ids))})", ids)
+        return [_loads(row[0]) for row in rows]
+
+    def iter_auctions(self, projection=None):
+        for batch in self.iter_batches(COLLECTION_NAME, 1000):
+            yield from batch
+
+    def insert_auction(self, doc):
+        doc.setdefault("_id", ObjectId())
+        self._execute(
+            "INSERT INTO auctions (id, cort_ofc_cd, user_cs_no, dspsl_gds_seq, pending_dxdy_ymd, cancelled, doc) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._auction_row(doc)
+        )
+        return doc["_id"]
+
+    def update_auction(self, auction_id, fields):
+        # 읽기-수정-쓰기가 다른 스레드/프로세스와 섞이지 않도록 하나의 쓰기 트랜잭션으로 처리
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute("SELECT doc FROM auctions WHERE id = ?", (str(auction_id),)).fetchall()
+                if not rows:
+                    self.conn.rollback()
+                    return False
+
+                updated = {**_loads(rows[0][0]), **fields}
+                if _dumps(updated) == rows[0][0]:
+                    self.conn.rollback()
+                    return False
+
+                self.conn.execute(
+                    "UPDATE auctions SET cort_ofc_cd = ?, user_cs_no = ?, dspsl_gds_seq = ?, pending_dxdy_ymd = ?, "
+                    "cancelled = ?, doc = ? WHERE id = ?",
+                    self._auction_row(updated)[1:] + (str(auction_id),)
+                )
+                self.conn.commit()
+                return True
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def find_expired_auctions(self, today_str, projection=None):
+        rows = self._query(
+            "SELECT doc FROM auctions WHERE cancelled = 0 AND pending_dxdy_ymd IS NOT NULL AND pending_dxdy_ymd < ?",
+            (today_str,)
+        )
+        return [_loads(row[0]) for row in rows]
+
+    def insert_images(self, docs):
+        return self._insert_generic(AUCTION_IMAGES_COLLECTION, docs)
+
+    def delete_images(self, image_ids):
+        self._executemany("DELETE FROM documents WHERE collection = ? AND id = ?",
+                          [(AUCTION_IMAGES_COLLECTION, str(image_id)) for image_id in image_ids])
+
+    def study_exists(self, bo_cd, cs_no):
+        return bool(self._query("SELECT 1 FROM auction_studies WHERE cort_ofc_cd = ? AND cs_no = ? LIMIT 1",
+                                (bo_cd, cs_no)))
+
+    def insert_study(self, doc):
+        doc.setdefault("_id", ObjectId())
+        reference = doc.get("reference", {})
+        self._execute("INSERT INTO auction_studies (id, cort_ofc_cd, cs_no, doc) VALUES (?, ?, ?, ?)",
+                      (str(doc["_id"]), reference.get("cortOfcCd"), reference.get("csNo"), _dumps(doc)))
+
+    def upsert_summary(self, doc):
+        self.upsert_summaries([doc])
+
+    def upsert_summaries(self, docs):
+        self._executemany("REPLACE INTO auction_summary (id, updated_at, doc) VALUES (?, ?, ?)",
+                          [(str(doc["_id"]), _timestamp(doc.get("updatedAt")), _dumps(doc)) for doc in docs])
+
+    def delete_summary(self, auction_id):
+        self._execute("DELETE FROM auction_summary WHERE id = ?", (str(auction_id),))
+
+    def clear_summaries(self):
+        self._execute("DELETE FROM auction_summary")
+
+    def find_summary_ids_updated(self, since, until):
+        sql = "SELECT id FROM auction_summary WHERE updated_at <= ?"
+        params = [_timestamp(until)]
+        if since:
+            sql += " AND updated_at > ?"
+            params.append(_timestamp(since))
+        return [ObjectId(row[0]) for row in self._query(sql, params)]
+
+    def increment_market_stats(self, stats_id, key_fields, increments):
+        # 읽기-수정-쓰기를 하나의 쓰기 트랜잭션으로 처리
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute("SELECT doc FROM documents WHERE collection = ? AND id = ?",
+                                         (MARKET_STATS_COLLECTION, stats_id)).fetchall()
+                doc = _loads(rows[0][0]) if rows else {"_id": stats_id, **key_fields}
+                for field, value in increments.items():
+                    doc[field] = doc.get(field, 0) + value
+                doc["updatedAt"] = datetime.now()
+                self.conn.execute("REPLACE INTO documents (collection, id, doc) VALUES (?, ?, ?)",
+                                  (MARKET_STATS_COLLECTION, stats_id, _dumps(doc)))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def clear_market_stats(self):
+        self._execute("DELETE FROM documents WHERE collection = ?", (MARKET_STATS_COLLECTION,))
+
+    def _insert_generic(self, collection_name, docs):
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+        self._executemany("INSERT INTO documents (collection, id, doc) VALUES (?, ?, ?)",
+                          [(collection_name, str(doc["_id"]), _dumps(doc)) for doc in docs])
+        return [doc["_id"] for doc in docs]
+
+    def insert_documents(self, collection_name, docs):
+        if docs:
+            self._insert_generic(collection_name, docs)
+
+    def upsert_documents(self, collection_name, docs):
+        self._executemany("REPLACE INTO documents (collection, id, doc) VALUES (?, ?, ?)",
+                          [(collection_name, str(doc["_id"]), _dumps(doc)) for doc in docs])
+
+    def delete_documents(self, collection_name, field, value):
+        self._execute("DELETE FROM documents WHERE collection = ? AND json_extract(doc, ?) = ?",
+                      (collection_name, f"$.{field}", value))
+
+    def iter_batches(self, collection_name, batch_size):
+        tables = {COLLECTION_NAME: "auctions", AUCTION_STUDIES_COLLECTION: "auction_studies",
+                  AUCTION_SUMMARY_COLLECTION: "auction_summary"}
+        table = tables.get(collection_name)
+        last_id = ""
+        while True:
+            # ObjectId 문자열(16진수 24자리)은 사전순이 곧 생성 순서
+            if table:
+                rows = self._query(f"SELECT id, doc FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                                   (last_id, batch_size))
+            else:
+                rows = self._query("SELECT id, doc FROM documents WHERE collection = ? AND id > ? ORDER BY id LIMIT ?",
+                                   (collection_name, last_id, batch_size))
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            yield [_loads(row[1]) for row in rows]
+
+
+def create_store(backend=STAGING_BACKEND):
+    """설정된 스테이징 저장소 생성"""
+    if backend == BACKEND_SQLITE:
+        logging.info(f"스테이징 저장소: SQLite ({STAGING_SQLITE_PATH})")
+        return SqliteStagingStore()
+    if backend == BACKEND_MONGO:
+        return MongoStagingStore()
+    raise ValueError(f"알 수 없는 스테이징 저장소: {backend}")
+
+
+# 배치 전체가 공유하는 스테이징 저장소
+store = create_store()
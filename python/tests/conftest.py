@@ -0,0 +1,15 @@
+"""
+테스트 공통 설정
+
+python 디렉터리에서 `python -m pytest tests`로 실행한다.
+모듈이 python 디렉터리에 평평하게 있으므로 import 경로에 추가하고,
+스테이징 저장소는 임시 SQLite 파일을 사용하도록 설정한다 (로컬 MongoDB 불필요).
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("STAGING_BACKEND", "sqlite")
+os.environ.setdefault("STAGING_SQLITE_PATH", os.path.join(tempfile.mkdtemp(prefix="staging_test_"), "staging.sqlite3"))
@@ -0,0 +1,129 @@
+import glob
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from bson import ObjectId
+
+import analytics_export
+from analytics_export import compact_partition, flatten_auction
+from auction_dates import FAILED_BID_RESULT_CODE, SALE_RESULT_CODE
+
+if analytics_export.pa is not None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+EXPORTED_AT = datetime(2026, 3, 1, 6, 0)
+
+
+def make_auction(dates):
+    return {
+        "_id": ObjectId(),
+        "csBaseInfo": {"csNo": "2025타경1234", "cortOfcCd": "B000210"},
+        "dspslGdsDxdyInfo": {"dspslGdsSeq": "1", "dspslDxdyYmd": "20260105", "aeeEvlAmt": "10,000,000",
+                             "lclsUtilCd": "30000", "mclsUtilCd": "30100", "sclsUtilCd": "30101"},
+        "gdsDspslDxdyLst": dates,
+        "gdsDspslObjctLst": [{"adongSdNm": "서울특별시", "adongSggNm": "강남구"}],
+        "location": {"type": "Point", "coordinates": [127.05, 37.5]}
+    }
+
+
+class FlattenAuctionTest(unittest.TestCase):
+
+    def test_sold_after_failed_bid(self):
+        auction = make_auction([
+            {"dxdyYmd": "20260105", "auctnDxdyKndCd": "01", "auctnDxdyRsltCd": FAILED_BID_RESULT_CODE,
+             "tsLwsDspslPrc": "10,000,000"},
+            {"dxdyYmd": "20260209", "auctnDxdyKndCd": "01", "auctnDxdyRsltCd": SALE_RESULT_CODE,
+             "tsLwsDspslPrc": "7,000,000", "dspslAmt": "8,100,000"}
+        ])
+        auction_row, date_rows = flatten_auction(auction, EXPORTED_AT)
+
+        self.assertEqual(auction_row["auctionId"], str(auction["_id"]))
+        self.assertEqual(auction_row["dspslGdsSeq"], 1)
+        # 최초 기일(dspslDxdyYmd)이 아닌 현재 기일 기준
+        self.assertEqual(auction_row["dxdyYmd"], "20260209")
+        self.assertEqual(auction_row["auctnDxdyRsltCd"], SALE_RESULT_CODE)
+        self.assertEqual(auction_row["aeeEvlAmt"], 10_000_000)
+        self.assertEqual(auction_row["minPrice"], 7_000_000)
+        self.assertEqual(auction_row["saleAmount"], 8_100_000)
+        self.assertEqual(auction_row["failedBidCount"], 1)
+        self.assertEqual((auction_row["lat"], auction_row["lon"]), (37.5, 127.05))
+        self.assertFalse(auction_row["isAuctionCancelled"])
+
+        self.assertEqual([row["dxdyYmd"] for row in date_rows], ["20260105", "20260209"])
+        self.assertEqual([row["dspslAmt"] for row in date_rows], [None, 8_100_000])
+        self.assertTrue(all(row["exportedAt"] == EXPORTED_AT for row in date_rows))
+
+    def test_missing_fields(self):
+        auction = {"_id": ObjectId(), "csBaseInfo": {"cortOfcCd": "B000210"}}
+        auction_row, date_rows = flatten_auction(auction, EXPORTED_AT)
+        self.assertIsNone(auction_row["dxdyYmd"])
+        self.assertIsNone(auction_row["saleAmount"])
+        self.assertIsNone(auction_row["lat"])
+        self.assertEqual(auction_row["failedBidCount"], 0)
+        self.assertEqual(date_rows, [])
+
+
+@unittest.skipIf(analytics_export.pa is None, "pyarrow가 설치되지 않음")
+class CompactPartitionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.partition_dir = tempfile.mkdtemp()
+        self.schema = pa.schema([("auctionId", pa.string()), ("dxdyYmd", pa.string()),
+                                 ("exportedAt", pa.timestamp("ms"))])
+
+    def write(self, name, rows):
+        path = os.path.join(self.partition_dir, name)
+        pq.write_table(pa.Table.from_pylist(rows, schema=self.schema), path)
+
+    def test_keeps_latest_export_per_auction(self):
+        older, newer = datetime(2026, 3, 1), datetime(2026, 3, 2)
+        self.write("part-1-00000.parquet", [
+            {"auctionId": "a", "dxdyYmd": "20260301", "exportedAt": older},
+            {"auctionId": "a", "dxdyYmd": "20260310", "exportedAt": older},
+            {"auctionId": "b", "dxdyYmd": "20260305", "exportedAt": older}
+        ])
+        self.write("part-2-00000.parquet", [
+            {"auctionId": "a", "dxdyYmd": "20260301", "exportedAt": newer},
+            {"auctionId": "a", "dxdyYmd": "20260311", "exportedAt": newer}
+        ])
+
+        with mock.patch.object(analytics_export, "COMPACT_MIN_FILES", 2):
+            self.assertTrue(compact_partition(self.partition_dir, "3"))
+
+        files = sorted(os.path.basename(path) for path in glob.glob(os.path.join(self.partition_dir, "*")))
+        self.assertEqual(files, ["compacted-3.parquet"])
+        rows = pq.read_table(os.path.join(self.partition_dir, "compacted-3.parquet")).to_pylist()
+        self.assertEqual(
+            sorted((row["auctionId"], row["dxdyYmd"], row["exportedAt"]) for row in rows),
+            [("a", "20260301", newer), ("a", "20260311", newer), ("b", "20260305", older)]
+        )
+
+    def test_skips_partition_with_few_files(self):
+        self.write("part-1-00000.parquet", [{"auctionId": "a", "dxdyYmd": "20260301",
+                                            "exportedAt": datetime(2026, 3, 1)}])
+        self.assertFalse(compact_partition(self.partition_dir, "2"))
+        self.assertEqual(os.listdir(self.partition_dir), ["part-1-00000.parquet"])
+
+
+@unittest.skipIf(analytics_export.pa is None, "pyarrow가 설치되지 않음")
+class FullExportTest(unittest.TestCase):
+
+    def test_full_export_iterates_all_auctions(self):
+        export_dir = tempfile.mkdtemp()
+        auctions = [make_auction([{"dxdyYmd": "20260105", "auctnDxdyRsltCd": None}]) for _ in range(3)]
+        with mock.patch.object(analytics_export, "store") as store:
+            store.iter_auctions.return_value = iter(auctions)
+            analytics_export.export_auction_outcomes(export_dir, full=True)
+
+        store.find_summary_ids_updated.assert_not_called()
+        files = glob.glob(os.path.join(export_dir, "auctions", "*", "*", "*.parquet"))
+        exported_ids = [row["auctionId"] for path in files for row in pq.read_table(path).to_pylist()]
+        self.assertEqual(sorted(exported_ids), sorted(str(auction["_id"]) for auction in auctions))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+
+import requests
+
+import db
+import fetch_detail
+from config import AUCTION_IMAGES_COLLECTION
+from storage import SqliteStagingStore
+from tests.test_json_stream import FakeResponse
+
+SRN_SA_NO = "2024타경100"
+BO_CD = "B000210"
+
+
+def detail_body(dspsl_dxdy_ymd, pictures):
+    return json.dumps({
+        "data": {
+            "dma_result": {
+                "csBaseInfo": {"cortOfcCd": BO_CD, "userCsNo": SRN_SA_NO, "csNo": "20240130000100"},
+                "dspslGdsDxdyInfo": {"dspslGdsSeq": 1, "dspslDxdyYmd": dspsl_dxdy_ymd},
+                "csPicLst": [{"picFile": f"{dspsl_dxdy_ymd}-{n}"} for n in range(pictures)],
+                "gdsDspslDxdyLst": [{"dxdyYmd": dspsl_dxdy_ymd}]
+            }
+        }
+    }).encode()
+
+
+class FetchAuctionDetailTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = SqliteStagingStore(os.path.join(directory.name, "staging.sqlite3"))
+        self.addCleanup(self.store.conn.close)
+        patchers = [mock.patch(f"{module}.store", self.store) for module in ("db", "market_stats", "auction_summary")]
+        patchers.append(mock.patch.object(db, "IMAGE_BATCH_SIZE", 4))
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.insert_images = mock.patch.object(self.store, "insert_images", wraps=self.store.insert_images).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def fetch(self, body, list_auction_date, error=None):
+        @contextmanager
+        def stream_post(url, **kwargs):
+            response = FakeResponse(body)
+            response.raise_for_status = lambda: None
+            if error:
+                # 이미지 일부를 받은 뒤 연결이 끊긴 경우
+                chunks = response.iter_content
+
+                def iter_content(chunk_size):
+                    for n, chunk in enumerate(chunks(chunk_size)):
+                        if n * response.chunk_size > len(body) // 2:
+                            raise error
+                        yield chunk
+                response.iter_content = iter_content
+            yield response
+
+        with mock.patch.object(fetch_detail.court_throttle, "stream_post", stream_post):
+            return fetch_detail.fetch_auction_detail(SRN_SA_NO, "1", BO_CD, list_auction_date)
+
+    def images(self):
+        return [doc for batch in self.store.iter_batches(AUCTION_IMAGES_COLLECTION, 100) for doc in batch]
+
+    def test_new_auction_streams_images_in_batches(self):
+        self.assertTrue(self.fetch(detail_body("20260101", 10), "20260101"))
+
+        self.assertEqual([len(call.args[0]) for call in self.insert_images.call_args_list], [4, 4, 2])
+        auction = db.find_auction(SRN_SA_NO, 1, BO_CD)
+        images = self.images()
+        self.assertEqual(auction["csPicLst"], [image["_id"] for image in images])
+        self.assertTrue(all(image["auction_id"] == auction["_id"] for image in images))
+        self.assertNotIn("csPicLst", auction["gdsDspslDxdyLst"][0])
+
+    def test_date_change_replaces_images(self):
+        self.fetch(detail_body("20260101", 3), "20260101")
+        self.assertTrue(self.fetch(detail_body("20260201", 5), "20260201"))
+
+        auction = db.find_auction(SRN_SA_NO, 1, BO_CD)
+        images = self.images()
+        self.assertEqual(len(images), 5)
+        self.assertTrue(all(image["csPicLst"]["picFile"].startswith("20260201") for image in images))
+        self.assertEqual(auction["csPicLst"], [image["_id"] for image in images])
+        self.assertEqual(auction["dspslGdsDxdyInfo"]["dspslDxdyYmd"], "20260201")
+
+    def test_interrupted_response_leaves_no_images(self):
+        error = requests.exceptions.ChunkedEncodingError("끊김")
+        self.assertFalse(self.fetch(detail_body("20260101", 40), "20260101", error=error))
+        self.assertGreater(self.insert_images.call_count, 0)
+        self.assertEqual(self.images(), [])
+        self.assertIsNone(db.find_auction(SRN_SA_NO, 1, BO_CD))
+
+
+if __name__ == "__main__":
+    unittest.main()
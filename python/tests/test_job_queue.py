@@ -0,0 +1,156 @@
+"""
+작업 큐 테스트
+
+worker.process_job 테스트는 조회 함수를 대체하여 네트워크 없이 실행된다.
+임대(lease) 테스트는 실제 MongoDB가 필요하므로 TEST_MONGO_URI가 설정된 경우에만 실행한다.
+
+    mongod --dbpath /tmp/mongo-test --port 27018 &
+    TEST_MONGO_URI=mongodb://localhost:27018/ python -m pytest tests/test_job_queue.py
+
+테스트는 TEST_DB_NAME 데이터베이스의 batch_jobs 컬렉션을 비우고 사용하므로 운영 DB를 지정하지 않는다.
+"""
+import multiprocessing
+import os
+import unittest
+from unittest import mock
+
+from pymongo import MongoClient
+
+import job_queue
+import worker
+from config import JOB_MAX_ATTEMPTS, JOB_QUEUE_COLLECTION
+from utils import get_date_str
+
+TEST_MONGO_URI = os.environ.get("TEST_MONGO_URI")
+TEST_DB_NAME = "auction_batch_test"
+
+# 여러 프로세스 임대 테스트 설정
+LEASE_TEST_JOBS = 200
+LEASE_TEST_PROCESSES = 4
+
+
+def _use_test_collection(uri):
+    collection = MongoClient(uri)[TEST_DB_NAME][JOB_QUEUE_COLLECTION]
+    job_queue.jobs_collection = collection
+    job_queue._indexes_ready = False
+    return collection
+
+
+def _claim_until_empty(uri, worker_id, results):
+    """자식 프로세스: 큐가 빌 때까지 임대 후 완료 처리하고 임대한 작업 ID 목록 전달"""
+    _use_test_collection(uri)
+    claimed = []
+    while True:
+        job = job_queue.claim_job(worker_id)
+        if job is None:
+            break
+        claimed.append(str(job["_id"]))
+        job_queue.ack_job(job["_id"])
+    results.put((worker_id, claimed))
+
+
+class ProcessJobTest(unittest.TestCase):
+
+    def test_request_failure_raises(self):
+        job = {"kind": job_queue.JOB_DETAIL, "boCd": "B000210", "srnSaNo": "2024타경1", "maemulSer": 1,
+               "payload": {"maeGiil": "20260101"}}
+        with mock.patch("worker.fetch_auction_detail", return_value=False):
+            with self.assertRaises(RuntimeError):
+                worker.process_job(job)
+        with mock.patch("worker.fetch_auction_detail", return_value=True):
+            worker.process_job(job)
+
+    def test_history_failure_raises(self):
+        job = {"kind": job_queue.JOB_HISTORY, "boCd": "B000210", "srnSaNo": "2024타경1", "maemulSer": 1,
+               "payload": {"auctionId": "id"}}
+        with mock.patch("worker.refresh_auction_history_by_id", return_value="failed"):
+            with self.assertRaises(RuntimeError):
+                worker.process_job(job)
+        for outcome in ("success", "cancelled", None):
+            with mock.patch("worker.refresh_auction_history_by_id", return_value=outcome):
+                worker.process_job(job)
+
+    def test_failed_job_goes_to_fail_job(self):
+        job = {"_id": 1, "kind": job_queue.JOB_STUDY, "boCd": "B000210", "srnSaNo": "2024타경1", "payload": {}}
+        with mock.patch("worker.ensure_job_indexes"), \
+                mock.patch("worker.claim_job", side_effect=[job, None]), \
+                mock.patch("worker.count_open_jobs", return_value=0), \
+                mock.patch("worker.fetch_curst_exmndc", return_value=False), \
+                mock.patch("worker.fail_job") as fail_job, \
+                mock.patch("worker.ack_job") as ack_job:
+            self.assertEqual(worker.run_worker("test"), 0)
+        fail_job.assert_called_once()
+        ack_job.assert_not_called()
+
+
+@unittest.skipUnless(TEST_MONGO_URI, "TEST_MONGO_URI가 설정되지 않음")
+class JobLeaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.original = (job_queue.jobs_collection, job_queue._indexes_ready)
+        self.collection = _use_test_collection(TEST_MONGO_URI)
+        self.collection.drop()
+        job_queue.ensure_job_indexes()
+
+    def tearDown(self):
+        self.collection.drop()
+        job_queue.jobs_collection, job_queue._indexes_ready = self.original
+
+    def test_enqueue_is_idempotent(self):
+        self.assertTrue(job_queue.enqueue_job(job_queue.JOB_DETAIL, "B1", "S1", 1, due_ymd="20260101"))
+        self.assertFalse(job_queue.enqueue_job(job_queue.JOB_DETAIL, "B1", "S1", 1, due_ymd="20260101"))
+        self.assertEqual(self.collection.count_documents({}), 1)
+
+    def test_done_job_can_be_enqueued_again(self):
+        job_queue.enqueue_job(job_queue.JOB_STUDY, "B1", "S1")
+        job = job_queue.claim_job("w1")
+        self.assertTrue(job_queue.ack_job(job["_id"]))
+        self.assertFalse(job_queue.ack_job(job["_id"]))
+        self.assertTrue(job_queue.enqueue_job(job_queue.JOB_STUDY, "B1", "S1"))
+        self.assertEqual(job_queue.count_open_jobs(), 1)
+
+    def test_failed_job_is_retried_until_max_attempts(self):
+        job_queue.enqueue_job(job_queue.JOB_HISTORY, "B1", "S1", 1)
+        for attempt in range(1, JOB_MAX_ATTEMPTS + 1):
+            job = job_queue.claim_job("w1")
+            self.assertEqual(job["attempts"], attempt)
+            job_queue.fail_job(job, "오류")
+        self.assertIsNone(job_queue.claim_job("w1"))
+        self.assertEqual(self.collection.find_one()["status"], job_queue.STATUS_FAILED)
+
+    def test_expired_lease_is_reclaimed(self):
+        job_queue.enqueue_job(job_queue.JOB_DETAIL, "B1", "S1", 1)
+        first = job_queue.claim_job("w1", lease_seconds=-1)
+        second = job_queue.claim_job("w2")
+        self.assertEqual(first["_id"], second["_id"])
+        self.assertEqual(second["leasedBy"], "w2")
+
+    def test_claim_order_follows_priority(self):
+        job_queue.enqueue_job(job_queue.JOB_DETAIL, "B1", "late", 1, due_ymd="29991231")
+        job_queue.enqueue_job(job_queue.JOB_DETAIL, "B1", "soon", 1, due_ymd=get_date_str(1))
+        self.assertEqual(job_queue.claim_job("w1")["srnSaNo"], "soon")
+
+    def test_each_job_is_leased_once_across_processes(self):
+        for i in range(LEASE_TEST_JOBS):
+            job_queue.enqueue_job(job_queue.JOB_DETAIL, "B1", f"S{i}", 1)
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        processes = [
+            context.Process(target=_claim_until_empty, args=(TEST_MONGO_URI, f"w{i}", results))
+            for i in range(LEASE_TEST_PROCESSES)
+        ]
+        for process in processes:
+            process.start()
+        claimed = [results.get(timeout=120) for _ in processes]
+        for process in processes:
+            process.join()
+
+        all_ids = [job_id for _, ids in claimed for job_id in ids]
+        self.assertEqual(len(all_ids), LEASE_TEST_JOBS)
+        self.assertEqual(len(set(all_ids)), LEASE_TEST_JOBS)
+        self.assertEqual(job_queue.count_open_jobs(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
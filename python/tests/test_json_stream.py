@@ -0,0 +1,117 @@
+import json
+import unittest
+
+import requests
+
+import json_stream
+
+RESPONSE = {
+    "status": 200,
+    "message": "",
+    "data": {
+        "dma_pageInfo": {"totalCnt": "2", "pageNo": 1},
+        "unused": [{"big": "x" * 1000}] * 10,
+        "dlt_srchResult": [
+            {"srnSaNo": "2024타경1", "lclsUtilCd": "10000", "nested": {"values": [1, 2.5]}},
+            {"srnSaNo": "2024타경2", "lclsUtilCd": "30000"}
+        ],
+        "dma_result": {
+            "csBaseInfo": {"csNo": "20240130000001"},
+            "csPicLst": [{"picFile": "AAAA"}, {"picFile": "BBBB"}],
+            "gdsDspslObjctLst": [{"adongSdNm": "서울특별시", "ltno": 12}]
+        }
+    }
+}
+
+
+class FakeResponse:
+    """작은 청크로 본문을 나눠 주는 스트리밍 응답"""
+
+    def __init__(self, body, chunk_size=7):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+    def json(self):
+        # requests.Response.json과 같은 예외 타입
+        try:
+            return json.loads(self.body)
+        except json.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+
+    def close(self):
+        self.closed = True
+
+
+class StreamJsonTestMixin:
+    """ijson 사용 여부와 관계없이 같은 결과를 내는지 확인"""
+
+    use_ijson = True
+
+    def setUp(self):
+        self.original = json_stream.ijson
+        if not self.use_ijson:
+            json_stream.ijson = None
+        elif json_stream.ijson is None:
+            self.skipTest("ijson이 설치되지 않음")
+
+    def tearDown(self):
+        json_stream.ijson = self.original
+
+    def response(self, document=RESPONSE):
+        return FakeResponse(json.dumps(document, ensure_ascii=False).encode("utf-8"))
+
+    def test_items_are_passed_to_callback(self):
+        items = []
+        response = self.response()
+        result = json_stream.stream_json(response, subtrees=["data.dma_pageInfo.totalCnt"],
+                                         items={"data.dlt_srchResult.item": items.append})
+
+        self.assertEqual(result, {"data.dma_pageInfo.totalCnt": "2"})
+        self.assertEqual(items, RESPONSE["data"]["dlt_srchResult"])
+        self.assertTrue(response.closed)
+
+    def test_item_array_is_split_out_of_subtree(self):
+        pictures = []
+        result = json_stream.stream_json(self.response(), subtrees=["data.dma_result"],
+                                         items={"data.dma_result.csPicLst.item": pictures.append})
+
+        expected = dict(RESPONSE["data"]["dma_result"])
+        del expected["csPicLst"]
+        self.assertEqual(result["data.dma_result"], expected)
+        self.assertEqual(pictures, RESPONSE["data"]["dma_result"]["csPicLst"])
+
+    def test_missing_paths_are_omitted(self):
+        items = []
+        result = json_stream.stream_json(self.response({"status": 200, "data": {}}),
+                                         subtrees=["data.dma_result"], items={"data.dlt_srchResult.item": items.append})
+        self.assertEqual(result, {})
+        self.assertEqual(items, [])
+
+    def test_numbers_are_not_decimal(self):
+        items = []
+        json_stream.stream_json(self.response(), items={"data.dlt_srchResult.item": items.append})
+        value = items[0]["nested"]["values"][1]
+        self.assertIs(type(value), float)
+
+    def test_invalid_json_raises_request_exception(self):
+        response = FakeResponse(b'{"data": {"dma_result": {')
+        with self.assertRaises(requests.exceptions.RequestException):
+            json_stream.stream_json(response, subtrees=["data.dma_result"])
+        self.assertTrue(response.closed)
+
+
+class StreamJsonTest(StreamJsonTestMixin, unittest.TestCase):
+    use_ijson = True
+
+
+class StreamJsonFallbackTest(StreamJsonTestMixin, unittest.TestCase):
+    use_ijson = False
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import tempfile
+import unittest
+from copy import deepcopy
+from unittest import mock
+
+from auction_dates import FAILED_BID_RESULT_CODE, SALE_RESULT_CODE
+from config import MARKET_STATS_COLLECTION
+from db import find_auction, replace_auction_detail, save_auction_detail, start_image_stream
+from market_stats import date_list_contribution, rebuild_market_stats, record_date_changes
+from storage import SqliteStagingStore
+
+
+def date(ymd, result=None, amount=None):
+    entry = {"dxdyYmd": ymd, "auctnDxdyRsltCd": result}
+    if amount is not None:
+        entry["dspslAmt"] = amount
+    return entry
+
+
+AUCTION = {
+    "csBaseInfo": {"cortOfcCd": "B000210"},
+    "dspslGdsDxdyInfo": {"aeeEvlAmt": "100,000,000", "sclsUtilCd": "20104"},
+    "gdsDspslObjctLst": [{"adongSdNm": "서울특별시", "adongSggNm": "강남구"}]
+}
+
+
+class DateListContributionTest(unittest.TestCase):
+
+    def test_no_results(self):
+        self.assertEqual(date_list_contribution([date("20260101")], 100), {})
+        self.assertEqual(date_list_contribution(None, 100), {})
+
+    def test_failed_bids_then_sale(self):
+        dates = [
+            date("20250101", FAILED_BID_RESULT_CODE),
+            date("20250201", FAILED_BID_RESULT_CODE),
+            date("20250301", SALE_RESULT_CODE, 80_000_000),
+            date("20250310", "003")
+        ]
+        self.assertEqual(date_list_contribution(dates, 100_000_000), {
+            "failedBidCount": 2,
+            "saleCount": 1,
+            "soldAuctionCount": 1,
+            "failedRoundsAtSaleSum": 2,
+            "saleAmountSum": 80_000_000,
+            "appraisalAmountSum": 100_000_000,
+            "saleToAppraisalSum": 0.8,
+            "saleToAppraisalCount": 1,
+            "resultedAuctionCount": 1
+        })
+
+    def test_resale_counts_only_sale(self):
+        dates = [date("20250101", SALE_RESULT_CODE, 90), date("20250401", SALE_RESULT_CODE, 70)]
+        contribution = date_list_contribution(dates, 100)
+        self.assertEqual(contribution["saleCount"], 2)
+        self.assertEqual(contribution["soldAuctionCount"], 1)
+        self.assertEqual(contribution["saleAmountSum"], 90)
+
+    def test_sale_without_appraisal(self):
+        contribution = date_list_contribution([date("20250101", SALE_RESULT_CODE, "50,000")], None)
+        self.assertEqual(contribution["saleAmountSum"], 50_000)
+        self.assertNotIn("saleToAppraisalSum", contribution)
+
+
+class RecordDateChangesTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch("market_stats.store")
+        self.store = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_applies_only_difference(self):
+        old = [date("20250101", FAILED_BID_RESULT_CODE), date("20250201")]
+        new = [date("20250101", FAILED_BID_RESULT_CODE), date("20250201", SALE_RESULT_CODE, 80_000_000)]
+        record_date_changes(AUCTION, old, new)
+
+        stats_id, key_fields, increments = self.store.increment_market_stats.call_args[0]
+        self.assertEqual(stats_id, "B000210|서울특별시|강남구|20104")
+        self.assertEqual(key_fields["adongSggNm"], "강남구")
+        self.assertNotIn("failedBidCount", increments)
+        self.assertNotIn("resultedAuctionCount", increments)
+        self.assertEqual(increments["saleCount"], 1)
+        self.assertEqual(increments["failedRoundsAtSaleSum"], 1)
+        self.assertAlmostEqual(increments["saleToAppraisalSum"], 0.8)
+
+    def test_same_history_is_not_counted_twice(self):
+        dates = [date("20250101", FAILED_BID_RESULT_CODE)]
+        record_date_changes(AUCTION, dates, list(dates))
+        self.store.increment_market_stats.assert_not_called()
+
+    def test_removed_result_is_subtracted(self):
+        record_date_changes(AUCTION, [date("20250101", FAILED_BID_RESULT_CODE)], [date("20250101")])
+        increments = self.store.increment_market_stats.call_args[0][2]
+        self.assertEqual(increments, {"failedBidCount": -1, "resultedAuctionCount": -1})
+
+
+class IncrementalMatchesRebuildTest(unittest.TestCase):
+    """상세 저장/교체 경로의 증분 통계가 전체 재집계 결과와 같은지 SQLite 저장소로 확인"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = SqliteStagingStore(os.path.join(directory.name, "staging.sqlite3"))
+        self.addCleanup(self.store.conn.close)
+        for module in ("db", "market_stats", "auction_summary"):
+            patcher = mock.patch(f"{module}.store", self.store)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def detail(self, dates, appraisal="100,000,000"):
+        data = deepcopy(AUCTION)
+        data["csBaseInfo"].update({"userCsNo": "2024타경100", "csNo": "20240130000100"})
+        data["dspslGdsDxdyInfo"].update({"dspslGdsSeq": 1, "dspslDxdyYmd": "20250101", "aeeEvlAmt": appraisal})
+        data["gdsDspslDxdyLst"] = dates
+        return data
+
+    def stats(self):
+        docs = [doc for batch in self.store.iter_batches(MARKET_STATS_COLLECTION, 100) for doc in batch]
+        return {doc["_id"]: {field: value for field, value in doc.items()
+                             if isinstance(value, (int, float)) and value} for doc in docs}
+
+    def assert_matches_rebuild(self):
+        incremental = self.stats()
+        rebuild_market_stats()
+        self.assertEqual(incremental, self.stats())
+        return incremental
+
+    def test_insert_then_refresh(self):
+        save_auction_detail(self.detail([date("20250101", FAILED_BID_RESULT_CODE), date("20250201")]),
+                            start_image_stream())
+        stats = self.assert_matches_rebuild()
+        self.assertEqual(stats["B000210|서울특별시|강남구|20104"]["failedBidCount"], 1)
+
+        existing = find_auction("2024타경100", 1, "B000210")
+        replace_auction_detail(existing, self.detail([
+            date("20250101", FAILED_BID_RESULT_CODE), date("20250201", SALE_RESULT_CODE, 80_000_000)
+        ]), start_image_stream(existing))
+        stats = self.assert_matches_rebuild()
+        self.assertEqual(stats["B000210|서울특별시|강남구|20104"]["soldAuctionCount"], 1)
+
+    def test_refresh_with_changed_appraisal(self):
+        save_auction_detail(self.detail([date("20250101", SALE_RESULT_CODE, 80_000_000)]), start_image_stream())
+        existing = find_auction("2024타경100", 1, "B000210")
+        replace_auction_detail(existing, self.detail([date("20250101", SALE_RESULT_CODE, 80_000_000)],
+                                                     appraisal="160,000,000"), start_image_stream(existing))
+        stats = self.assert_matches_rebuild()
+        self.assertAlmostEqual(stats["B000210|서울특별시|강남구|20104"]["saleToAppraisalSum"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
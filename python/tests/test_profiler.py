@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import profiler
+from profiler import MODE_CPROFILE, _classify, profile_stage
+
+
+class ProfileStageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        profiler.enable(MODE_CPROFILE, self.output_dir)
+        self.addCleanup(profiler.enable, None)
+
+    def outputs(self, suffix):
+        return [name for name in os.listdir(self.output_dir) if name.endswith(suffix)]
+
+    def test_concurrent_stages_fall_back_to_sample(self):
+        first_entered = threading.Event()
+        second_done = threading.Event()
+        errors = []
+
+        def first():
+            try:
+                with profile_stage("first"):
+                    first_entered.set()
+                    second_done.wait(5)
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=first)
+        thread.start()
+        first_entered.wait(5)
+        try:
+            with profile_stage("second"):
+                pass
+        finally:
+            second_done.set()
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual([name.split("_", 2)[2] for name in self.outputs(".prof")], ["first.prof"])
+        self.assertEqual([name.split("_", 2)[2] for name in self.outputs(".collapsed")], ["second.collapsed"])
+
+        # 앞 단계가 끝나면 다시 cProfile 사용 가능
+        with profile_stage("third"):
+            pass
+        self.assertEqual(len(self.outputs(".prof")), 2)
+
+    def test_profiler_start_error_does_not_fail_stage(self):
+        with mock.patch("profiler.cProfile.Profile.enable",
+                        side_effect=ValueError("Another profiling tool is already active")):
+            with profile_stage("stage"):
+                ran = True
+        self.assertTrue(ran)
+        self.assertEqual(self.outputs(".prof"), [])
+        self.assertEqual(len(self.outputs(".collapsed")), 1)
+
+    def test_stage_error_propagates(self):
+        with self.assertRaises(KeyError):
+            with profile_stage("stage"):
+                raise KeyError("x")
+        # 실패한 단계도 프로파일러를 정리하므로 다음 단계가 cProfile 사용 가능
+        with profile_stage("next"):
+            pass
+        self.assertEqual(len(self.outputs(".prof")), 2)
+
+
+class ClassifyTest(unittest.TestCase):
+
+    def test_mongo_over_tls_is_mongo(self):
+        frames = [
+            ("/app/update_expired_auctions.py", 1, "main"),
+            ("/site-packages/pymongo/synchronous/network.py", 1, "receive_message"),
+            ("/usr/lib/python3.12/ssl.py", 1, "recv_into")
+        ]
+        self.assertEqual(_classify(frames), "mongo")
+
+    def test_http(self):
+        frames = [
+            ("/app/fetch_detail.py", 1, "fetch_auction_detail"),
+            ("/site-packages/requests/sessions.py", 1, "request"),
+            ("/usr/lib/python3.12/socket.py", 1, "readinto")
+        ]
+        self.assertEqual(_classify(frames), "http")
+
+    def test_python(self):
+        self.assertEqual(_classify([("/app/main.py", 1, "main")]), "python")
+
+
+if __name__ == "__main__":
+    unittest.main()
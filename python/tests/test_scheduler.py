@@ -0,0 +1,53 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from scheduler import UNKNOWN_DUE_DAYS, RunBudget, urgency_key
+
+
+def ymd(days):
+    return (datetime.today() + timedelta(days=days)).strftime("%Y%m%d")
+
+
+class UrgencyKeyTest(unittest.TestCase):
+
+    def test_closest_due_date_first(self):
+        due_dates = [ymd(10), ymd(-3), None, ymd(1), "잘못된 날짜", ymd(-20)]
+        ordered = sorted(due_dates, key=urgency_key)
+        self.assertEqual(ordered[:4], [ymd(1), ymd(-3), ymd(10), ymd(-20)])
+        self.assertEqual(urgency_key(None)[0], UNKNOWN_DUE_DAYS)
+        self.assertEqual(urgency_key("잘못된 날짜")[0], UNKNOWN_DUE_DAYS)
+
+    def test_accepts_formatted_dates(self):
+        due = datetime.today() + timedelta(days=2)
+        self.assertEqual(urgency_key(due.strftime("%Y.%m.%d"))[0], 2)
+
+    def test_unchecked_first_on_same_due_date(self):
+        checked = datetime(2026, 1, 1)
+        self.assertLess(urgency_key(ymd(1)), urgency_key(ymd(1), checked))
+        self.assertLess(urgency_key(ymd(1), checked), urgency_key(ymd(1), checked + timedelta(hours=1)))
+
+
+class RunBudgetTest(unittest.TestCase):
+
+    def test_unlimited_budget(self):
+        budget = RunBudget()
+        self.assertFalse(budget.exhausted())
+        budget.start(None)
+        self.assertFalse(budget.exhausted())
+        self.assertIsNone(budget.remaining())
+
+    def test_exhausted_after_deadline(self):
+        budget = RunBudget()
+        with mock.patch("scheduler.time.monotonic", return_value=100.0):
+            budget.start(60)
+        with mock.patch("scheduler.time.monotonic", return_value=159.0):
+            self.assertFalse(budget.exhausted())
+            self.assertEqual(budget.remaining(), 1.0)
+        with mock.patch("scheduler.time.monotonic", return_value=160.0):
+            self.assertTrue(budget.exhausted())
+            self.assertEqual(budget.remaining(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
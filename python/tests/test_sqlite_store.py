@@ -0,0 +1,142 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from config import DEFERRED_WORK_COLLECTION, MARKET_STATS_COLLECTION
+from storage import SqliteStagingStore
+
+
+def make_auction(seq=1, dates=None, cancelled=False):
+    return {
+        "csBaseInfo": {"cortOfcCd": "B000210", "userCsNo": "2024타경100", "csNo": "20240130000100"},
+        "dspslGdsDxdyInfo": {"dspslGdsSeq": seq, "dspslDxdyYmd": "20260101"},
+        "gdsDspslDxdyLst": dates or [],
+        "isAuctionCancelled": cancelled
+    }
+
+
+class SqliteStagingStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SqliteStagingStore(os.path.join(self.directory.name, "staging.sqlite3"))
+
+    def tearDown(self):
+        self.store.conn.close()
+        self.directory.cleanup()
+
+    def test_auction_round_trip_keeps_types(self):
+        doc = make_auction()
+        doc["checkedAt"] = datetime(2026, 1, 2, 3, 4, 5, 678000)
+        auction_id = self.store.insert_auction(doc)
+
+        loaded = self.store.get_auction(auction_id)
+        self.assertIsInstance(loaded["_id"], ObjectId)
+        self.assertEqual(loaded["checkedAt"], doc["checkedAt"])
+        self.assertEqual(self.store.find_auction("B000210", "2024타경100", 1)["_id"], auction_id)
+        self.assertIsNone(self.store.find_auction("B000210", "2024타경100", 2))
+
+    def test_update_auction_reports_changes(self):
+        auction_id = self.store.insert_auction(make_auction())
+        self.assertTrue(self.store.update_auction(auction_id, {"isAuctionCancelled": True}))
+        self.assertFalse(self.store.update_auction(auction_id, {"isAuctionCancelled": True}))
+        self.assertFalse(self.store.update_auction(ObjectId(), {"isAuctionCancelled": True}))
+
+    def test_find_expired_auctions_uses_pending_dates(self):
+        expired = self.store.insert_auction(make_auction(1, [
+            {"dxdyYmd": "20250101", "auctnDxdyRsltCd": "002"},
+            {"dxdyYmd": "20250201", "auctnDxdyRsltCd": None}
+        ]))
+        self.store.insert_auction(make_auction(2, [{"dxdyYmd": "20250101", "auctnDxdyRsltCd": "001"}]))
+        self.store.insert_auction(make_auction(3, [{"dxdyYmd": "20990101", "auctnDxdyRsltCd": None}]))
+        self.store.insert_auction(make_auction(4, [{"dxdyYmd": "20250101", "auctnDxdyRsltCd": None}], cancelled=True))
+
+        self.assertEqual([doc["_id"] for doc in self.store.find_expired_auctions("20260101")], [expired])
+
+        # 결과가 기록되면 더 이상 조회되지 않음
+        self.store.update_auction(expired, {"gdsDspslDxdyLst": [{"dxdyYmd": "20250201", "auctnDxdyRsltCd": "001"}]})
+        self.assertEqual(self.store.find_expired_auctions("20260101"), [])
+
+    def test_concurrent_updates_are_not_lost(self):
+        auction_id = self.store.insert_auction(make_auction())
+
+        def update(field):
+            for i in range(20):
+                self.store.update_auction(auction_id, {field: i})
+
+        threads = [threading.Thread(target=update, args=(f"field{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        loaded = self.store.get_auction(auction_id)
+        self.assertEqual([loaded[f"field{n}"] for n in range(4)], [19] * 4)
+
+    def test_studies_and_images(self):
+        self.assertFalse(self.store.study_exists("B000210", "20240130000100"))
+        self.store.insert_study({"reference": {"cortOfcCd": "B000210", "csNo": "20240130000100"}})
+        self.assertTrue(self.store.study_exists("B000210", "20240130000100"))
+
+        image_ids = self.store.insert_images([{"csPicLst": {"n": i}} for i in range(3)])
+        self.assertEqual(len(image_ids), 3)
+        self.store.delete_images(image_ids[:2])
+        images = [doc for batch in self.store.iter_batches("auction_images", 10) for doc in batch]
+        self.assertEqual([doc["_id"] for doc in images], image_ids[2:])
+
+    def test_summaries_updated_window(self):
+        now = datetime(2026, 1, 1, 12, 0, 0)
+        old, new = ObjectId(), ObjectId()
+        self.store.upsert_summaries([{"_id": old, "updatedAt": now - timedelta(hours=1)},
+                                     {"_id": new, "updatedAt": now}])
+
+        self.assertEqual(set(self.store.find_summary_ids_updated(None, now)), {old, new})
+        self.assertEqual(self.store.find_summary_ids_updated(now - timedelta(minutes=30), now), [new])
+
+        self.store.delete_summary(new)
+        self.assertEqual(self.store.find_summary_ids_updated(None, now), [old])
+        self.store.clear_summaries()
+        self.assertEqual(self.store.find_summary_ids_updated(None, now), [])
+
+    def test_market_stats_increments(self):
+        key = {"cortOfcCd": "B000210", "sclsUtilCd": "20104"}
+        self.store.increment_market_stats("k", key, {"saleCount": 1, "saleAmountSum": 100})
+        self.store.increment_market_stats("k", key, {"saleCount": 1, "failedBidCount": 2})
+
+        stats = [doc for batch in self.store.iter_batches(MARKET_STATS_COLLECTION, 10) for doc in batch]
+        self.assertEqual(len(stats), 1)
+        self.assertEqual((stats[0]["saleCount"], stats[0]["saleAmountSum"], stats[0]["failedBidCount"]), (2, 100, 2))
+        self.assertEqual(stats[0]["cortOfcCd"], "B000210")
+
+        self.store.clear_market_stats()
+        self.assertEqual(list(self.store.iter_batches(MARKET_STATS_COLLECTION, 10)), [])
+
+    def test_upsert_documents_replaces_by_id(self):
+        self.store.upsert_documents(DEFERRED_WORK_COLLECTION, [{"_id": "a", "n": 1}, {"_id": "b", "n": 1}])
+        self.store.upsert_documents(DEFERRED_WORK_COLLECTION, [{"_id": "a", "n": 2}])
+        docs = [doc for batch in self.store.iter_batches(DEFERRED_WORK_COLLECTION, 10) for doc in batch]
+        self.assertEqual([(doc["_id"], doc["n"]) for doc in docs], [("a", 2), ("b", 1)])
+
+    def test_delete_documents_by_field(self):
+        self.store.upsert_documents(DEFERRED_WORK_COLLECTION, [
+            {"_id": "a", "stage": "update_expired"},
+            {"_id": "b", "stage": "fetch_detail_0004601"},
+            {"_id": "c", "stage": "update_expired"}
+        ])
+        self.store.delete_documents(DEFERRED_WORK_COLLECTION, "stage", "update_expired")
+        docs = [doc for batch in self.store.iter_batches(DEFERRED_WORK_COLLECTION, 10) for doc in batch]
+        self.assertEqual([doc["_id"] for doc in docs], ["b"])
+
+    def test_iter_batches_in_id_order(self):
+        ids = [self.store.insert_auction(make_auction(seq)) for seq in range(5)]
+        batches = list(self.store.iter_batches("auctions", 2))
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual([doc["_id"] for batch in batches for doc in batch], ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
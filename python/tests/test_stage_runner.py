@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from stage_runner import OUTCOME_FAILED, OUTCOME_SKIPPED, OUTCOME_SUCCESS, Stage, run_stages
+
+
+class RunStagesTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch("stage_runner.store")
+        self.store = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.events = []
+        self.lock = threading.Lock()
+
+    def record(self, name, duration=0.0):
+        def func():
+            with self.lock:
+                self.events.append(("start", name))
+            time.sleep(duration)
+            with self.lock:
+                self.events.append(("end", name))
+        return func
+
+    def test_dependent_stage_waits_for_dependencies(self):
+        stages = [
+            Stage("a", self.record("a", 0.1)),
+            Stage("b", self.record("b", 0.05)),
+            Stage("c", self.record("c"), depends_on=["a", "b"])
+        ]
+        results = run_stages(stages)
+
+        self.assertTrue(all(result["outcome"] == OUTCOME_SUCCESS for result in results.values()))
+        start_c = self.events.index(("start", "c"))
+        self.assertLess(self.events.index(("end", "a")), start_c)
+        self.assertLess(self.events.index(("end", "b")), start_c)
+
+    def test_independent_stages_overlap(self):
+        stages = [Stage("a", self.record("a", 0.1)), Stage("b", self.record("b", 0.1))]
+        run_stages(stages)
+        self.assertEqual([event for event, _ in self.events[:2]], ["start", "start"])
+
+    def test_failure_skips_dependents(self):
+        def fail():
+            raise RuntimeError("실패")
+
+        stages = [
+            Stage("a", fail),
+            Stage("b", self.record("b"), depends_on=["a"]),
+            Stage("c", self.record("c"), depends_on=["b"]),
+            Stage("d", self.record("d"))
+        ]
+        results = run_stages(stages)
+
+        self.assertEqual(results["a"]["outcome"], OUTCOME_FAILED)
+        self.assertEqual(results["b"]["outcome"], OUTCOME_SKIPPED)
+        self.assertEqual(results["c"]["outcome"], OUTCOME_SKIPPED)
+        self.assertEqual(results["d"]["outcome"], OUTCOME_SUCCESS)
+
+    def test_unselected_dependency_counts_as_done(self):
+        stages = [Stage("a", self.record("a")), Stage("b", self.record("b"), depends_on=["a"])]
+        results = run_stages(stages, selected=["b"])
+        self.assertEqual(list(results), ["b"])
+        self.assertEqual(self.events, [("start", "b"), ("end", "b")])
+
+    def test_cycle_is_rejected(self):
+        stages = [Stage("a", self.record("a"), depends_on=["b"]), Stage("b", self.record("b"), depends_on=["a"])]
+        with self.assertRaises(ValueError):
+            run_stages(stages)
+
+    def test_unknown_stage_is_rejected(self):
+        with self.assertRaises(ValueError):
+            run_stages([Stage("a", self.record("a"))], selected=["x"])
+
+    def test_run_is_recorded_with_critical_path(self):
+        stages = [
+            Stage("a", self.record("a", 0.05)),
+            Stage("b", self.record("b")),
+            Stage("c", self.record("c"), depends_on=["a", "b"])
+        ]
+        run_stages(stages)
+
+        _, docs = self.store.insert_documents.call_args[0]
+        self.assertEqual(docs[0]["criticalPath"], ["a", "c"])
+        self.assertEqual({stage["name"] for stage in docs[0]["stages"]}, {"a", "b", "c"})
+
+
+if __name__ == "__main__":
+    unittest.main()
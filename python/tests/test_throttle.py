@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+
+from throttle import AdaptiveThrottle
+
+
+class AdaptiveThrottleRecordTest(unittest.TestCase):
+
+    def make_throttle(self, **kwargs):
+        options = {"initial_rate": 1.0, "min_rate": 0.2, "max_rate": 5.0, "increase_step": 0.1,
+                   "decrease_factor": 0.5, "latency_threshold": 5.0, "latency_spike_floor": 1.0}
+        options.update(kwargs)
+        return AdaptiveThrottle("test", **options)
+
+    def test_success_increases_rate_up_to_max(self):
+        throttle = self.make_throttle(initial_rate=4.95)
+        throttle.record(status_code=200, latency=0.1)
+        self.assertAlmostEqual(throttle.rate, 5.0)
+        throttle.record(status_code=200, latency=0.1)
+        self.assertAlmostEqual(throttle.rate, 5.0)
+
+    def test_error_decreases_rate_down_to_min(self):
+        throttle = self.make_throttle(initial_rate=0.3)
+        with mock.patch("throttle.time.monotonic", side_effect=[0.0, 100.0]):
+            throttle.record(status_code=503)
+            throttle.record(status_code=429)
+        self.assertAlmostEqual(throttle.rate, 0.2)
+        self.assertEqual(throttle.metrics()["errors"], 1)
+        self.assertEqual(throttle.metrics()["throttled"], 1)
+
+    def test_relative_spike_below_floor_is_ignored(self):
+        throttle = self.make_throttle(initial_rate=1.5)
+        for _ in range(5):
+            throttle.record(status_code=200, latency=0.2)
+        rate = throttle.rate
+        throttle.record(status_code=200, latency=0.7)  # 평균의 3배 이상이지만 하한(1초) 이하
+        self.assertGreater(throttle.rate, rate)
+        self.assertEqual(throttle.metrics()["latency_spikes"], 0)
+
+    def test_relative_spike_above_floor_decreases_rate(self):
+        throttle = self.make_throttle()
+        for _ in range(5):
+            throttle.record(status_code=200, latency=0.3)
+        rate = throttle.rate
+        throttle.record(status_code=200, latency=1.5)
+        self.assertAlmostEqual(throttle.rate, rate * 0.5)
+        self.assertEqual(throttle.metrics()["latency_spikes"], 1)
+
+    def test_one_decrease_per_request_period(self):
+        throttle = self.make_throttle(initial_rate=2.0)
+        # 감소 후 속도 1.0 req/s → 1초 동안 추가 감소 없음
+        with mock.patch("throttle.time.monotonic", side_effect=[10.0, 10.5, 11.5]):
+            throttle.record(status_code=503)
+            throttle.record(status_code=503)
+            self.assertAlmostEqual(throttle.rate, 1.0)
+            throttle.record(status_code=503)
+        self.assertAlmostEqual(throttle.rate, 0.5)
+        self.assertEqual(throttle.metrics()["errors"], 3)
+
+    def test_divide_limits(self):
+        throttle = self.make_throttle(initial_rate=2.0)
+        throttle.divide_limits(4)
+        self.assertAlmostEqual(throttle.max_rate, 1.25)
+        self.assertAlmostEqual(throttle.min_rate, 0.05)
+        self.assertAlmostEqual(throttle.rate, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
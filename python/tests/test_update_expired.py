@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import update_expired_auctions
+from auction_dates import FAILED_BID_RESULT_CODE
+from update_expired_auctions import auction_due_ymd, update_expired_auctions as run_update
+
+
+def ymd(days):
+    return (datetime.today() + timedelta(days=days)).strftime("%Y%m%d")
+
+
+def auction(cs_no, initial_days, dates):
+    return {
+        "csBaseInfo": {"cortOfcCd": "B000210", "csNo": cs_no},
+        "dspslGdsDxdyInfo": {"dspslGdsSeq": 1, "dspslDxdyYmd": ymd(initial_days)},
+        "gdsDspslDxdyLst": dates
+    }
+
+
+class AuctionDueYmdTest(unittest.TestCase):
+
+    def test_uses_current_date_entry(self):
+        # 최초 기일은 유찰되고 새 기일이 잡힌 경우 새 기일 기준
+        doc = auction("2025타경1", -30, [
+            {"dxdyYmd": ymd(-30), "auctnDxdyRsltCd": FAILED_BID_RESULT_CODE},
+            {"dxdyYmd": ymd(-1), "auctnDxdyRsltCd": None}
+        ])
+        self.assertEqual(auction_due_ymd(doc), ymd(-1))
+
+    def test_falls_back_to_initial_date(self):
+        self.assertEqual(auction_due_ymd(auction("2025타경1", -5, [])), ymd(-5))
+
+
+class UpdateExpiredBudgetTest(unittest.TestCase):
+
+    def setUp(self):
+        # 최초 기일(dspslDxdyYmd)은 모두 같지만 현재 기일은 서로 다름
+        self.auctions = [
+            auction(f"2025타경{days}", -60, [
+                {"dxdyYmd": ymd(-60), "auctnDxdyRsltCd": FAILED_BID_RESULT_CODE},
+                {"dxdyYmd": ymd(-days), "auctnDxdyRsltCd": None}
+            ])
+            for days in (20, 1, 7, 3)
+        ]
+        self.processed = []
+        self.remaining_calls = None
+
+        patches = [
+            mock.patch.object(update_expired_auctions, "get_auctions_with_expired_dates",
+                              return_value=self.auctions),
+            mock.patch.object(update_expired_auctions, "refresh_auction_history",
+                              side_effect=self._refresh),
+            mock.patch.object(update_expired_auctions, "clear_deferred_work"),
+            mock.patch.object(update_expired_auctions, "save_deferred_work"),
+            mock.patch.object(update_expired_auctions, "run_budget")
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        update_expired_auctions.run_budget.exhausted.side_effect = self._exhausted
+
+    def _refresh(self, doc):
+        self.processed.append(doc["csBaseInfo"]["csNo"])
+        return "success"
+
+    def _exhausted(self):
+        if self.remaining_calls is None:
+            return False
+        self.remaining_calls -= 1
+        return self.remaining_calls < 0
+
+    def test_processes_in_urgency_order(self):
+        run_update(batch_size=2, use_queue=False)
+        self.assertEqual(self.processed, ["2025타경1", "2025타경3", "2025타경7", "2025타경20"])
+        update_expired_auctions.clear_deferred_work.assert_called_once_with("update_expired")
+        update_expired_auctions.save_deferred_work.assert_called_once_with("update_expired", [])
+
+    def test_defers_rest_when_budget_exhausted(self):
+        # 배치 시작 확인 1회 + 매물별 확인 2회까지만 예산 남음
+        self.remaining_calls = 3
+        run_update(batch_size=10, use_queue=False)
+
+        self.assertEqual(self.processed, ["2025타경1", "2025타경3"])
+        stage, deferred = update_expired_auctions.save_deferred_work.call_args.args
+        self.assertEqual(stage, "update_expired")
+        self.assertEqual([item["srnSaNo"] for item in deferred], ["2025타경7", "2025타경20"])
+        self.assertEqual([item["dueYmd"] for item in deferred], [ymd(-7), ymd(-20)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+from config import (
+    THROTTLE_INITIAL_RATE, THROTTLE_MIN_RATE, THROTTLE_MAX_RATE, THROTTLE_INCREASE_STEP,
+    THROTTLE_DECREASE_FACTOR, THROTTLE_LATENCY_THRESHOLD, THROTTLE_LATENCY_SPIKE_FLOOR, REQUEST_TIMEOUT
+)
+
+# 평균 응답 시간 대비 이 배수를 넘으면 지연 급증으로 간주
+LATENCY_SPIKE_MULTIPLIER = 3.0
+# 평균 응답 시간(EWMA) 가중치
+LATENCY_EWMA_ALPHA = 0.2
+
+
+class AdaptiveThrottle:
+    """
+    서버 응답을 기반으로 요청 속도를 조절하는 AIMD 제어기
+
+    정상 응답이면 허용 속도를 가산 증가시키고,
+    429/5xx, 타임아웃, 지연 급증 시 곱셈 감소시킨다.
+    동시에 처리 중이던 요청들이 같은 혼잡을 겹쳐 보고하지 않도록
+    감소 후 한 요청 간격 동안은 추가 감소하지 않는다.
+    여러 모듈에서 하나의 인스턴스를 공유하며 스레드 안전하다.
+    속도 제한은 프로세스 단위이므로 한 호스트에서 여러 프로세스가 요청하면 divide_limits로 나눠야 한다.
+    """
+
+    def __init__(self, name, initial_rate=THROTTLE_INITIAL_RATE, min_rate=THROTTLE_MIN_RATE,
+                 max_rate=THROTTLE_MAX_RATE, increase_step=THROTTLE_INCREASE_STEP,
+                 decrease_factor=THROTTLE_DECREASE_FACTOR, latency_threshold=THROTTLE_LATENCY_THRESHOLD,
+                 latency_spike_floor=THROTTLE_LATENCY_SPIKE_FLOOR):
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_threshold = latency_threshold
+        self.latency_spike_floor = latency_spike_floor
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._latency_avg = None
+        self._decrease_blocked_until = 0.0
+        self._stats = {"requests": 0, "throttled": 0, "errors": 0, "timeouts": 0, "latency_spikes": 0}
+
+    def divide_limits(self, processes):
+        """같은 IP에서 processes개 프로세스가 요청할 때 이 프로세스 몫으로 하한/상한/현재 속도를 나눔"""
+        if processes <= 1:
+            return
+        with self._lock:
+            self.min_rate /= processes
+            self.max_rate /= processes
+            self.increase_step /= processes
+            self.rate /= processes
+        logging.info(f"[{self.name}] 프로세스 {processes}개로 요청 속도 분할: 상한 {self.max_rate:.2f} req/s")
+
+    def wait(self):
+        """현재 허용 속도에 맞춰 다음 요청 슬롯까지 대기"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, status_code=None, latency=None, timed_out=False, failed=False):
+        """응답 결과를 반영하여 허용 속도 조정"""
+        with self._lock:
+            self._stats["requests"] += 1
+            reason = None
+
+            if timed_out:
+                self._stats["timeouts"] += 1
+                reason = "타임아웃"
+            elif failed:
+                self._stats["errors"] += 1
+                reason = "연결 실패"
+            elif status_code == 429:
+                self._stats["throttled"] += 1
+                reason = "429 응답"
+            elif status_code is not None and status_code >= 500:
+                self._stats["errors"] += 1
+                reason = f"{status_code} 응답"
+            elif latency is not None and self._is_latency_spike(latency):
+                self._stats["latency_spikes"] += 1
+                reason = f"지연 급증 ({latency:.2f}초)"
+
+            if latency is not None:
+                if self._latency_avg is None:
+                    self._latency_avg = latency
+                else:
+                    self._latency_avg += LATENCY_EWMA_ALPHA * (latency - self._latency_avg)
+
+            previous = self.rate
+            now = time.monotonic()
+            if reason:
+                if now < self._decrease_blocked_until:
+                    return  # 직전 감소에 이미 반영된 혼잡
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._decrease_blocked_until = now + 1.0 / self.rate
+                logging.warning(
+                    f"[{self.name}] 요청 속도 감소: {previous:.2f} → {self.rate:.2f} req/s ({reason})")
+            elif status_code is not None and status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+                if self.rate != previous:
+                    logging.debug("[%s] 요청 속도 증가: %.2f → %.2f req/s", self.name, previous, self.rate)
+
+    def _is_latency_spike(self, latency):
+        if latency > self.latency_threshold:
+            return True
+        if latency <= self.latency_spike_floor:
+            return False
+        return self._latency_avg is not None and latency > self._latency_avg * LATENCY_SPIKE_MULTIPLIER
+
+    def post(self, url, **kwargs):
+        """속도 제어를 적용한 POST 요청"""
+        return self.request("POST", url, **kwargs)
+
+    def _send(self, method, url, kwargs):
+        """다음 요청 슬롯까지 대기 후 요청 (연결/타임아웃 오류는 기록 후 그대로 전달)"""
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        self.wait()
+
+        started = time.monotonic()
+        try:
+            return started, requests.request(method, url, **kwargs)
+        except requests.exceptions.Timeout:
+            self.record(timed_out=True)
+            raise
+        except requests.exceptions.ConnectionError:
+            self.record(failed=True)
+            raise
+
+    def request(self, method, url, **kwargs):
+        """속도 제어를 적용한 HTTP 요청 (예외는 그대로 전달)"""
+        started, response = self._send(method, url, kwargs)
+        self.record(status_code=response.status_code, latency=time.monotonic() - started)
+        return response
+
+    @contextmanager
+    def stream_post(self, url, **kwargs):
+        """
+        속도 제어를 적용한 스트리밍 POST 요청 (with 블록 안에서 본문을 읽음)
+
+        본문을 다 읽을 때까지를 응답 시간으로 기록하고, 본문을 읽다가 끊기거나
+        타임아웃되면 실패로 기록한다. 블록이 끝나면 응답을 닫는다.
+        """
+        kwargs["stream"] = True
+        started, response = self._send("POST", url, kwargs)
+        body_failed = False
+        try:
+            yield response
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.ContentDecodingError, requests.exceptions.InvalidJSONError):
+            # 본문 읽기 중 타임아웃도 requests가 ConnectionError로 변환함
+            body_failed = True
+            raise
+        finally:
+            response.close()
+            if body_failed:
+                self.record(failed=True)
+            else:
+                self.record(status_code=response.status_code, latency=time.monotonic() - started)
+
+    def metrics(self):
+        """현재 요청 속도 및 누적 통계 반환"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "rate": round(self.rate, 3),
+                "latency_avg": round(self._latency_avg, 3) if self._latency_avg is not None else None,
+                **self._stats
+            }
+
+    def log_metrics(self):
+        """현재 요청 속도 및 누적 통계 로그 출력"""
+        m = self.metrics()
+        logging.info(
+            f"[{m['name']}] 현재 요청 속도: {m['rate']} req/s, 평균 응답 시간: {m['latency_avg']}초, "
+            f"요청 {m['requests']}건 (429: {m['throttled']}, 5xx/연결 실패: {m['errors']}, "
+            f"타임아웃: {m['timeouts']}, 지연 급증: {m['latency_spikes']})")
+
+
+# 모든 법원 API 엔드포인트가 공유하는 제어기
+court_throttle = AdaptiveThrottle("courtauction")
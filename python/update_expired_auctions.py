@@ -1,33 +1,38 @@
+import argparse
 import logging
-import time
 from datetime import datetime
 
 import requests
-from pymongo import MongoClient
 
-from config import MONGO_URI, DB_NAME, COLLECTION_NAME, HEADERS
-
-# MongoDB 설정
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
-auctions_collection = db[COLLECTION_NAME]
+from auction_dates import AUCTION_KIND_MAPPING, AUCTION_RESULT_MAPPING, SALE_RESULT_CODE, current_date_entry
+from auction_summary import refresh_auction_summary
+from config import HEADERS, USE_JOB_QUEUE
+from db import clear_deferred_work, save_deferred_work
+from job_queue import JOB_HISTORY, enqueue_job
+from log_setup import count_event, setup_logging
+from market_stats import record_date_changes
+from profiler import add_profile_arguments, enable_from_args, profile_stage
+from scheduler import run_budget, urgency_key
+from storage import store
+from throttle import court_throttle
 
 # API 상수
 AUCTION_HISTORY_URL = "https://www.courtauction.go.kr/pgj/pgj15A/selectCsDtlDxdyDts.on"
 
-# 코드 매핑
-AUCTION_KIND_MAPPING = {
-    "매각기일": "01", "매각결정기일": "02", "대금지급기한": "03", "대금지급및 배당기일": "04",
-    "배당기일": "05", "일부배당": "06", "일부배당 및 상계": "07", "심문기일": "08",
-    "추가배당기일": "09", "개찰기일": "11"
-}
-
-AUCTION_RESULT_MAPPING = {
-    "매각준비": "000", "매각": "001", "유찰": "002", "최고가매각허가결정": "003",
-    "차순위매각허가결정": "004", "최고가매각불허가결정": "005", "차순위매각불허가결정": "006",
-    "기한변경": "007", "추후지정": "008", "납부": "009", "미납": "010",
-    "기한후납부": "011", "상계허가": "012", "진행": "013", "변경": "014",
-    "배당종결": "015", "배당불가": "016", "최고가매각허가취소결정": "017", "차순위매각허가취소결정": "018"
+# 기일 내역 갱신에 필요한 필드
+EXPIRED_AUCTION_PROJECTION = {
+    "_id": 1,
+    "csBaseInfo.csNo": 1,
+    "csBaseInfo.cortOfcCd": 1,
+    "dspslGdsDxdyInfo.dspslGdsSeq": 1,
+    "dspslGdsDxdyInfo.dspslDxdyYmd": 1,
+    "gdsDspslDxdyLst": 1,
+    "historyCheckedAt": 1,
+    # 시장 통계 키 및 매각가율 계산용
+    "dspslGdsDxdyInfo.aeeEvlAmt": 1,
+    "dspslGdsDxdyInfo.sclsUtilCd": 1,
+    "gdsDspslObjctLst.adongSdNm": 1,
+    "gdsDspslObjctLst.adongSggNm": 1
 }
 
 
@@ -35,37 +40,19 @@ def get_auctions_with_expired_dates():
     """경매 기일이 지났지만 결과가 업데이트되지 않은 데이터 조회"""
     today_str = datetime.today().strftime("%Y%m%d")
 
-    pipeline = [
-        {
-            "$match": {
-                "gdsDspslDxdyLst": {
-                    "$elemMatch": {
-                        "dxdyYmd": {"$lt": today_str},
-                        "auctnDxdyRsltCd": None
-                    }
-                },
-                # 이미 취소 처리된 경매는 제외
-                "isAuctionCancelled": {"$ne": True}
-            }
-        },
-        {
-            "$project": {
-                "_id": 1,
-                "csBaseInfo.csNo": 1,
-                "csBaseInfo.cortOfcCd": 1,
-                "dspslGdsDxdyInfo.dspslGdsSeq": 1,
-                "gdsDspslDxdyLst": 1
-            }
-        }
-    ]
-
-    expired_auctions = list(auctions_collection.aggregate(pipeline))
+    # 이미 취소 처리된 경매는 제외
+    expired_auctions = store.find_expired_auctions(today_str, EXPIRED_AUCTION_PROJECTION)
     logging.info(f"기일이 지난 미업데이트 경매 데이터 {len(expired_auctions)}건 조회 완료")
     return expired_auctions
 
 
 def fetch_auction_history(bo_cd, srn_sa_no):
-    """경매 사건의 기일 내역 조회"""
+    """
+    경매 사건의 기일 내역 조회
+
+    Returns:
+        기일 내역 리스트 (내역이 없으면 빈 리스트), 요청/응답 오류 시 None
+    """
     custom_headers = HEADERS.copy()
     custom_headers[
         "User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
@@ -78,20 +65,21 @@ def fetch_auction_history(bo_cd, srn_sa_no):
     }
 
     try:
-        response = requests.post(AUCTION_HISTORY_URL, headers=custom_headers, json=data)
+        response = court_throttle.post(AUCTION_HISTORY_URL, headers=custom_headers, json=data)
         response.raise_for_status()
         result = response.json()
 
         if result["status"] == 200:
             history_list = result.get("data", {}).get("dlt_dxdyDtsLst", [])
-            logging.info(f"경매 기일 내역 조회 성공: 사건번호 {srn_sa_no}, 법원 코드 {bo_cd}, 내역 {len(history_list)}건")
+            count_event("history_fetched")
+            logging.debug("경매 기일 내역 조회 성공: 사건번호 %s, 법원 코드 %s, 내역 %d건", srn_sa_no, bo_cd, len(history_list))
             return history_list
 
-        logging.warning(f"경매 기일 내역 조회 실패: 사건번호 {srn_sa_no}, 법원 코드 {bo_cd}, 메시지: {result.get('message')}")
+        logging.warning("경매 기일 내역 조회 실패: 사건번호 %s, 법원 코드 %s, 메시지: %s", srn_sa_no, bo_cd, result.get("message"))
         return None
 
     except requests.exceptions.RequestException as e:
-        logging.error(f"경매 기일 내역 조회 요청 실패: {e}")
+        logging.error("경매 기일 내역 조회 요청 실패: %s", e)
         return None
 
 
@@ -135,7 +123,7 @@ def update_existing_date(existing_date, result_code, sale_price):
         existing_date["auctnDxdyRsltCd"] = result_code
         updated = True
 
-    if result_code == AUCTION_RESULT_MAPPING.get("매각") and sale_price:
+    if result_code == SALE_RESULT_CODE and sale_price:
         existing_date["dspslAmt"] = sale_price
         updated = True
 
@@ -160,31 +148,48 @@ def create_new_date_entry(date_str, time_str, history_item, kind_code, result_co
         "tsLwsDspslPrc": ts_lws_dspsl_prc
     }
 
-    if result_code == AUCTION_RESULT_MAPPING.get("매각") and sale_price:
+    if result_code == SALE_RESULT_CODE and sale_price:
         new_date["dspslAmt"] = sale_price
 
     return new_date
 
 
+def mark_history_checked(auction_id):
+    """기일 내역 마지막 확인 시간 기록 (다음 실행의 우선순위 계산에 사용)"""
+    store.update_auction(auction_id, {"historyCheckedAt": datetime.now()})
+
+
+def auction_due_ymd(auction):
+    """
+    우선순위 계산 기준 기일 (요약과 같은 현재 기일)
+
+    dspslGdsDxdyInfo.dspslDxdyYmd는 기일 내역 갱신 시 바뀌지 않으므로 기일 내역에서 구하고,
+    기일 내역이 없을 때만 사용한다.
+    """
+    return current_date_entry(auction).get("dxdyYmd") or auction.get("dspslGdsDxdyInfo", {}).get("dspslDxdyYmd")
+
+
+def auction_urgency_key(auction):
+    """매각기일 임박도 및 기일 내역 마지막 확인 시간 기준 우선순위 키"""
+    return urgency_key(auction_due_ymd(auction), auction.get("historyCheckedAt"))
+
+
 def mark_auction_as_cancelled(auction_id):
     """경매를 취소 처리하는 함수"""
     # 취소 처리 필드 추가 및 취소 시간 기록
-    update_result = auctions_collection.update_one(
-        {"_id": auction_id},
-        {
-            "$set": {
-                "isAuctionCancelled": True,
-                "cancelledAt": datetime.now(),
-                "cancelReason": "기일 내역 조회 불가"
-            }
-        }
-    )
-
-    if update_result.modified_count > 0:
-        logging.info(f"경매 취소 처리 완료: ID {auction_id}")
+    modified = store.update_auction(auction_id, {
+        "isAuctionCancelled": True,
+        "cancelledAt": datetime.now(),
+        "cancelReason": "기일 내역 조회 불가"
+    })
+
+    if modified:
+        refresh_auction_summary(auction_id)
+        count_event("history_cancelled")
+        logging.debug("경매 취소 처리 완료: ID %s", auction_id)
         return True
 
-    logging.warning(f"경매 취소 처리 실패: ID {auction_id}")
+    logging.warning("경매 취소 처리 실패: ID %s", auction_id)
     return False
 
 
@@ -208,9 +213,11 @@ def update_auction_with_history(auction, history_list):
     # 기일 내역이 있으면 DB에 덮어쓰기
     if new_dates:
         save_auction_dates(auction_id, new_dates)
+        # 새로 기록된 매각/유찰 결과를 시장 통계에 반영
+        record_date_changes(auction, auction.get("gdsDspslDxdyLst"), new_dates)
         return True
     else:
-        logging.warning(f"매칭되는 기일 내역 없음: ID {auction_id}")
+        logging.warning("매칭되는 기일 내역 없음: ID %s", auction_id)
         return False
 
 
@@ -264,43 +271,127 @@ def extract_result_info(history_item):
 
 def save_auction_dates(auction_id, new_dates):
     """경매 기일 내역을 DB에 저장"""
-    auctions_collection.update_one(
-        {"_id": auction_id},
-        {"$set": {"gdsDspslDxdyLst": new_dates}}
-    )
-    logging.info(f"경매 기일 내역 갱신 완료: ID {auction_id}, 항목 수 {len(new_dates)}개")
+    store.update_auction(auction_id, {"gdsDspslDxdyLst": new_dates})
+    refresh_auction_summary(auction_id)
+    count_event("history_updated")
+    logging.debug("경매 기일 내역 갱신 완료: ID %s, 항목 수 %d개", auction_id, len(new_dates))
+
+
+def refresh_auction_history(auction):
+    """
+    경매 한 건의 기일 내역 조회 및 갱신
+
+    Returns:
+        "success", "cancelled", 조회 요청이 실패한 경우 "failed", 갱신되지 않은 경우 None
+    """
+    bo_cd = auction["csBaseInfo"]["cortOfcCd"]
+    srn_sa_no = auction["csBaseInfo"]["csNo"]
+
+    history_list = fetch_auction_history(bo_cd, srn_sa_no)
+    if history_list is None:
+        # 일시적인 오류일 수 있으므로 취소 처리하지 않고 확인 시간도 남기지 않음 (다음에 먼저 재시도)
+        count_event("history_request_failed")
+        return "failed"
 
+    mark_history_checked(auction["_id"])
+
+    if not history_list:
+        # 기일 내역이 없는 경우 취소 처리
+        return "cancelled" if mark_auction_as_cancelled(auction["_id"]) else None
+    return "success" if update_auction_with_history(auction, history_list) else None
+
+
+def refresh_auction_history_by_id(auction_id):
+    """작업 큐에서 전달받은 경매 ID로 기일 내역 갱신"""
+    auction = store.get_auction(auction_id, EXPIRED_AUCTION_PROJECTION)
+    if not auction:
+        logging.warning(f"기일 내역 갱신 대상 경매 없음: ID {auction_id}")
+        return None
+    return refresh_auction_history(auction)
+
+
+def enqueue_expired_auctions():
+    """기일이 지난 경매 데이터를 작업 큐에 기일 내역 갱신 작업으로 등록"""
+    expired_auctions = get_auctions_with_expired_dates()
+    enqueued = 0
+    for auction in expired_auctions:
+        if enqueue_job(
+                JOB_HISTORY,
+                auction["csBaseInfo"]["cortOfcCd"],
+                auction["csBaseInfo"]["csNo"],
+                auction["dspslGdsDxdyInfo"]["dspslGdsSeq"],
+                due_ymd=auction_due_ymd(auction),
+                payload={"auctionId": auction["_id"]}
+        ):
+            enqueued += 1
+
+    logging.info(f"기일 내역 갱신 작업 등록 완료: {len(expired_auctions)}건 중 {enqueued}건 신규 등록")
+
+
+def update_expired_auctions(batch_size=50, use_queue=USE_JOB_QUEUE):
+    """
+    기일이 지난 경매 데이터를 긴급한 순서로 업데이트 (시간 예산 초과분은 이월)
+    use_queue: True이면 직접 처리하지 않고 작업 큐에 등록 (worker.py가 처리)
+    """
+    if use_queue:
+        enqueue_expired_auctions()
+        return
+
+    # 지난 실행의 이월 기록은 이번 실행에서 다시 조회하므로 삭제
+    clear_deferred_work("update_expired")
 
-def update_expired_auctions(batch_size=50):
-    """기일이 지난 경매 데이터 업데이트"""
     expired_auctions = get_auctions_with_expired_dates()
+    expired_auctions.sort(key=auction_urgency_key)
     total = len(expired_auctions)
     success_count = 0
     cancelled_count = 0
+    failed_count = 0
+    processed = 0
 
     logging.info(f"총 {total}건의 기일 지난 경매 데이터 업데이트 시작")
 
     for i in range(0, total, batch_size):
+        if run_budget.exhausted():
+            break
+
         batch = expired_auctions[i:i + batch_size]
-        logging.info(f"배치 처리 중: {i + 1} ~ {min(i + batch_size, total)} / {total}")
+        logging.info(f"배치 처리 중: {i + 1} ~ {min(i + batch_size, total)} / {total}, "
+                     f"요청 속도: {court_throttle.rate:.2f} req/s")
 
         for auction in batch:
-            time.sleep(0.5)  # 요청 간격 조정
-            bo_cd = auction["csBaseInfo"]["cortOfcCd"]
-            srn_sa_no = auction["csBaseInfo"]["csNo"]
+            if run_budget.exhausted():
+                break
 
-            history_list = fetch_auction_history(bo_cd, srn_sa_no)
+            processed += 1
+            outcome = refresh_auction_history(auction)
 
-            if not history_list:
-                # 기일 내역이 없는 경우 취소 처리
-                if mark_auction_as_cancelled(auction["_id"]):
-                    cancelled_count += 1
-            elif update_auction_with_history(auction, history_list):
+            if outcome == "cancelled":
+                cancelled_count += 1
+            elif outcome == "success":
                 success_count += 1
+            elif outcome == "failed":
+                failed_count += 1
+
+    save_deferred_work("update_expired", [
+        {
+            "boCd": auction["csBaseInfo"]["cortOfcCd"],
+            "srnSaNo": auction["csBaseInfo"]["csNo"],
+            "maemulSer": auction["dspslGdsDxdyInfo"]["dspslGdsSeq"],
+            "dueYmd": auction_due_ymd(auction) or ""
+        }
+        for auction in expired_auctions[processed:]
+    ])
 
-    logging.info(f"기일 지난 경매 데이터 업데이트 완료: 총 {total}건 중 {success_count}건 성공, {cancelled_count}건 취소 처리")
+    logging.info(f"기일 지난 경매 데이터 업데이트 완료: 총 {total}건 중 {processed}건 처리, {success_count}건 성공, {cancelled_count}건 취소 처리, {failed_count}건 조회 실패")
+    court_throttle.log_metrics()
 
 
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-    update_expired_auctions()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="기일이 지난 경매 데이터 업데이트")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    setup_logging()
+    enable_from_args(args)
+    with profile_stage("update_expired_auctions"):
+        update_expired_auctions()
\ No newline at end of file
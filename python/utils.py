@@ -7,6 +7,7 @@ def get_date_str(days_from_today):
 import requests
 import logging
 from config import KAKAO_REST_API_KEY
+from log_setup import count_event
 
 def address_to_coordinates(city, district, neighborhood, riname, lot_number):
     """
@@ -30,22 +31,26 @@ def address_to_coordinates(city, district, neighborhood, riname, lot_number):
     # ✅ 전체 주소로 변환 시도
     address_parts = [part for part in [city, district, neighborhood, riname, lot_number] if part]
     full_address = " ".join(address_parts)
-    logging.info(f"📍 변환 요청: {full_address}")
+    logging.debug("주소 변환 요청: %s", full_address)
 
     lat, lon = request_coordinates(full_address)
     if lat is not None and lon is not None:
-        logging.info(f"✅ 변환 성공: {full_address} → (위도: {lat}, 경도: {lon})")
+        count_event("geocode_success")
+        logging.debug("주소 변환 성공: %s → (위도: %s, 경도: %s)", full_address, lat, lon)
         return lat, lon
 
     # ✅ 변환 실패 시, riname까지만 사용하여 재시도
     if riname:
         fallback_address = " ".join([city, district, neighborhood, riname])
-        logging.warning(f"❌ 변환 실패, 재시도: {fallback_address}")
+        count_event("geocode_retry")
+        logging.debug("주소 변환 실패, 재시도: %s", fallback_address)
 
         lat, lon = request_coordinates(fallback_address)
         if lat is not None and lon is not None:
-            logging.info(f"✅ 변환 성공 (재시도): {fallback_address} → (위도: {lat}, 경도: {lon})")
+            count_event("geocode_success_retry")
+            logging.debug("주소 변환 성공 (재시도): %s → (위도: %s, 경도: %s)", fallback_address, lat, lon)
             return lat, lon
 
-    logging.error(f"❌ 변환 실패: {full_address}")
+    count_event("geocode_failed")
+    logging.error("주소 변환 실패: %s", full_address)
     return None, None  # 최종적으로 변환 실패 시
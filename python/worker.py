@@ -0,0 +1,120 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import time
+
+from fetch_curst_exmndc import fetch_curst_exmndc
+from fetch_detail import fetch_auction_detail
+from job_queue import (
+    JOB_DETAIL, JOB_STUDY, JOB_HISTORY, ensure_job_indexes, claim_job, ack_job, fail_job, count_open_jobs
+)
+from log_setup import setup_logging
+from profiler import add_profile_arguments, enable, enable_from_args, peak_rss_mb, profile_stage
+from scheduler import run_budget
+from throttle import court_throttle
+from update_expired_auctions import refresh_auction_history_by_id
+
+# 처리할 작업이 없을 때 다시 확인하기까지 대기 시간 (초)
+POLL_INTERVAL = 5
+
+
+def process_job(job):
+    """
+    작업 종류에 따라 조회 함수 실행
+
+    조회 요청이 실패하면 예외를 발생시켜 run_worker가 fail_job으로 재시도하도록 한다.
+    """
+    kind = job["kind"]
+    payload = job.get("payload", {})
+
+    if kind == JOB_DETAIL:
+        succeeded = fetch_auction_detail(job["srnSaNo"], job["maemulSer"], job["boCd"], payload.get("maeGiil", ""))
+    elif kind == JOB_STUDY:
+        succeeded = fetch_curst_exmndc(job["srnSaNo"], job["boCd"])
+    elif kind == JOB_HISTORY:
+        succeeded = refresh_auction_history_by_id(payload["auctionId"]) != "failed"
+    else:
+        raise ValueError(f"알 수 없는 작업 종류: {kind}")
+
+    if not succeeded:
+        raise RuntimeError(f"{kind} 조회 요청 실패")
+
+
+def run_worker(worker_id=None, kinds=None, drain=True):
+    """
+    작업 큐에서 작업을 임대하여 처리
+
+    Args:
+        worker_id: 워커 식별자 (기본값: 호스트명:PID)
+        kinds: 처리할 작업 종류 리스트 (None이면 전체)
+        drain: True이면 다른 워커의 작업까지 모두 끝나면 종료, False이면 계속 대기
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    ensure_job_indexes()
+    processed = 0
+    logging.info(f"워커 시작: {worker_id}, 작업 종류: {kinds or '전체'}")
+
+    while not run_budget.exhausted():
+        job = claim_job(worker_id, kinds)
+        if job is None:
+            # 다른 워커가 처리 중인 작업은 임대가 만료되면 다시 가져올 수 있으므로 대기
+            if drain and count_open_jobs(kinds) == 0:
+                break
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        try:
+            process_job(job)
+        except Exception as e:
+            fail_job(job, e)
+            continue
+
+        ack_job(job["_id"])
+        processed += 1
+
+    # 워커 프로세스 수를 정할 때 참고할 프로세스별 최대 메모리 사용량
+    logging.info(f"워커 종료: {worker_id}, 처리 작업 {processed}건, 최대 메모리 사용량 {peak_rss_mb()}MB")
+    return processed
+
+
+def _worker_process(kinds, drain, profile_mode, profile_dir, processes):
+    setup_logging()
+    enable(profile_mode, profile_dir)
+    # 각 프로세스가 제어기를 따로 가지므로 호스트 전체 상한이 유지되도록 나눠 가짐
+    court_throttle.divide_limits(processes)
+    with profile_stage(f"worker_{os.getpid()}"):
+        run_worker(kinds=kinds, drain=drain)
+
+
+def run_workers(processes, kinds=None, drain=True, profile_mode=None, profile_dir=None):
+    """여러 워커 프로세스를 실행하고 모두 종료될 때까지 대기"""
+    # MongoClient는 fork에 안전하지 않으므로 spawn으로 새 프로세스 생성
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_worker_process, args=(kinds, drain, profile_mode, profile_dir, processes))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="작업 큐 워커 실행")
+    parser.add_argument("--processes", type=int, default=1, help="워커 프로세스 수")
+    parser.add_argument("--kinds", nargs="*", choices=[JOB_DETAIL, JOB_STUDY, JOB_HISTORY], help="처리할 작업 종류")
+    parser.add_argument("--forever", action="store_true", help="큐가 비어도 종료하지 않고 계속 대기")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.processes > 1:
+        run_workers(args.processes, args.kinds, drain=not args.forever,
+                    profile_mode=args.profile, profile_dir=args.profile_dir)
+    else:
+        enable_from_args(args)
+        with profile_stage("worker"):
+            run_worker(kinds=args.kinds, drain=not args.forever)